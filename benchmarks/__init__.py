@@ -0,0 +1,7 @@
+"""Бенчмарки проектов YaNews и YaNote.
+
+Запускаются из корня репозитория: `python -m benchmarks.<имя>`.
+"""
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
@@ -0,0 +1,68 @@
+"""Сравнение BadWordsMatcher с прежним циклом по словарю.
+
+Запуск: python -m benchmarks.bad_words --words 5000 --text-length 2000
+"""
+import argparse
+import random
+import sys
+import timeit
+
+from benchmarks import BASE_DIR
+
+sys.path.insert(0, str(BASE_DIR / 'ya_news'))
+
+from news.matcher import BadWordsMatcher  # noqa: E402
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def random_word(rnd):
+    return ''.join(rnd.choices(ALPHABET, k=rnd.randint(5, 12)))
+
+
+def loop_search(words, text):
+    """Прежняя реализация CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--text-length', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    words = [random_word(rnd) for _ in range(args.words)]
+    text = ''
+    while len(text) < args.text_length:
+        text += random_word(rnd).capitalize() + ' '
+
+    build_time = timeit.timeit(lambda: BadWordsMatcher(words), number=1)
+    matcher = BadWordsMatcher(words)
+    assert (matcher.search(text) is None) == (
+        loop_search(words, text) is None
+    )
+    results = {
+        'loop': timeit.timeit(
+            lambda: loop_search(words, text), number=args.repeat
+        ),
+        'automaton': timeit.timeit(
+            lambda: matcher.search(text), number=args.repeat
+        ),
+    }
+    print(
+        f'words={args.words} text_length={len(text)} '
+        f'build={build_time * 1000:.1f} ms'
+    )
+    for name, total in results.items():
+        print(f'{name:>10}: {total / args.repeat * 1000:.3f} ms per text')
+
+
+if __name__ == '__main__':
+    main()
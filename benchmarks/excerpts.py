@@ -0,0 +1,84 @@
+"""Карточки главной: truncatewords по полному тексту против отрывка.
+
+Новости с текстами в несколько мегабайт. Замеряется промах кеша
+карточек: прежде карточка загружала весь текст новости и делила его
+на слова фильтром truncatewords, теперь читает готовый отрывок
+(News.excerpt), а текст не загружается вовсе. Отдельно замеряется
+вычисление отрывка при сохранении: make_excerpt против Truncator.
+
+Запуск: python -m benchmarks.excerpts --news 10 --megabytes 4
+"""
+import argparse
+import random
+
+from benchmarks.utils import setup_django, summary, test_database, timings
+
+CARD = (
+    '<h3>{{ news.title }}</h3><div>{{ news.date }}</div>'
+    '<div>{{ %s }}</div>'
+)
+VARIANTS = {
+    'truncatewords': ('text|truncatewords:15', ()),
+    'excerpt': ('excerpt', ('text',)),
+}
+
+
+def story(rnd, megabytes):
+    """Текст из случайных слов размером около megabytes МБ."""
+    words = [
+        ''.join(rnd.choices('абвгдеёжзийклмнопрстуфхцчшщэюя', k=length))
+        for length in range(3, 12)
+    ]
+    size = megabytes * 1024 * 1024 // 16
+    return ' '.join(rnd.choices(words, k=size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=10)
+    parser.add_argument('--megabytes', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from django.template import Context, Template
+    from django.utils.text import Truncator
+
+    from news.models import News, make_excerpt
+
+    rnd = random.Random(args.seed)
+    text = story(rnd, args.megabytes)
+    print(f'Текст новости: {len(text.encode()) / 2 ** 20:.1f} МБ')
+    for name, func in (
+        ('Truncator.words', lambda: Truncator(text).words(15)),
+        ('make_excerpt', lambda: make_excerpt(text)),
+    ):
+        result = summary(timings(func, args.repeat))
+        print(f'{name:>15}: p50 {result["p50"]:8.2f} мс, '
+              f'p99 {result["p99"]:8.2f} мс')
+
+    with test_database():
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text=text)
+            for index in range(args.news)
+        )
+        pks = list(News.objects.values_list('pk', flat=True))
+        for name, (expression, deferred) in VARIANTS.items():
+            template = Template(CARD % expression)
+
+            def render_cards():
+                news_list = News.objects.defer(*deferred).in_bulk(pks)
+                return [
+                    template.render(Context({'news': news}))
+                    for news in news_list.values()
+                ]
+
+            result = summary(timings(render_cards, args.repeat))
+            print(f'{name:>15}: {args.news} карточек, '
+                  f'p50 {result["p50"]:8.2f} мс, '
+                  f'p99 {result["p99"]:8.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Пропускная способность чтения новостей: WSGI против ASGI.
+
+Обработчики Django вызываются в процессе, без сетевого сервера:
+WSGI — из пула потоков, как в многопоточном сервере, ASGI — из
+concurrency сопрограмм в одном цикле событий, как в uvicorn.
+БД — файл SQLite во временном каталоге.
+
+Запуск: python -m benchmarks.news_asgi --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import importlib
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.utils import setup_django, summary, test_database
+
+
+def seed(news_count, comments_per_news):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from news.models import Comment, News
+
+    User = get_user_model()
+    with transaction.atomic():
+        author = User.objects.create(username='author')
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text='Текст новости. ' * 50)
+            for index in range(news_count)
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(news_id=news_id, author=author, text='Комментарий')
+                for news_id in News.objects.values_list('id', flat=True)
+                for _ in range(comments_per_news)
+            ),
+            batch_size=1000,
+        )
+    return list(News.objects.values_list('id', flat=True))
+
+
+def use_async_views(enabled):
+    """Пересобирает маршруты с синхронными или асинхронными представлениями."""
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    settings.NEWS_ASYNC_VIEWS = enabled
+    for module in ('news.urls', settings.ROOT_URLCONF):
+        importlib.reload(sys.modules[module])
+    clear_url_caches()
+
+
+def run_wsgi(paths, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def request(path):
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SCRIPT_NAME': '',
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http',
+        }
+        statuses = []
+        start = time.perf_counter()
+        response = handler(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        b''.join(response)
+        response.close()
+        assert statuses[0].startswith('200'), statuses[0]
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return list(executor.map(request, paths))
+
+
+def run_asgi(paths, concurrency):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    queue = iter(paths)
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def request(path):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'root_path': '',
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        start = time.perf_counter()
+        await handler(scope, receive, send)
+        assert messages[0]['status'] == 200, messages[0]
+        return (time.perf_counter() - start) * 1000
+
+    async def client(latencies):
+        for path in queue:
+            latencies.append(await request(path))
+
+    async def main():
+        latencies = []
+        await asyncio.gather(
+            *(client(latencies) for _ in range(concurrency))
+        )
+        return latencies
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from django.urls import reverse
+
+    rnd = random.Random(args.seed)
+    with TemporaryDirectory() as directory, test_database(
+        str(Path(directory) / 'news.sqlite3')
+    ):
+        news_ids = seed(args.news, args.comments)
+        # Поровну главной и страниц случайных новостей.
+        paths = [
+            reverse('news:detail', args=(rnd.choice(news_ids),))
+            if index % 2 else reverse('news:home')
+            for index in range(args.requests)
+        ]
+        print(f'news={args.news} comments={args.comments} '
+              f'concurrency={args.concurrency} requests={args.requests}')
+        deployments = (
+            ('wsgi', False, run_wsgi),
+            ('asgi', False, run_asgi),
+            ('asgi-async', True, run_asgi),
+        )
+        for name, async_views, run in deployments:
+            use_async_views(async_views)
+            # Прогрев: кеш карточек, шаблоны, соединения.
+            run(paths[:args.concurrency], args.concurrency)
+            start = time.perf_counter()
+            latencies = run(paths, args.concurrency)
+            elapsed = time.perf_counter() - start
+            result = summary(latencies)
+            print(f'{name:>10}: {len(paths) / elapsed:7.0f} req/s, '
+                  f'p50 {result["p50"]:.1f} ms, p99 {result["p99"]:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Поиск по заметкам: FTS5 против icontains.
+
+Запуск: python -m benchmarks.notes_search --notes 100000
+"""
+import argparse
+import itertools
+import random
+
+from benchmarks.utils import setup_django, summary, test_database, timings
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+
+def make_vocabulary(size, rnd):
+    """Слова словаря и накопленные веса: частота обратна рангу слова."""
+    words = [
+        ''.join(rnd.choices(ALPHABET, k=rnd.randint(3, 10)))
+        for _ in range(size)
+    ]
+    weights = itertools.accumulate(1 / rank for rank in range(1, size + 1))
+    return words, list(weights)
+
+
+def seed(notes_count, users_count, vocabulary, rnd):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from notes.models import Note
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{index}') for index in range(users_count)
+    )
+    users = list(User.objects.all())
+    words, weights = vocabulary
+    batch = []
+    with transaction.atomic():
+        for index in range(notes_count):
+            batch.append(Note(
+                title=' '.join(
+                    rnd.choices(words, cum_weights=weights, k=3)
+                ),
+                text=' '.join(
+                    rnd.choices(
+                        words, cum_weights=weights, k=rnd.randint(20, 200)
+                    )
+                ),
+                slug=f'note-{index}',
+                author=users[index % users_count],
+            ))
+            if len(batch) == 1000:
+                Note.objects.bulk_create(batch)
+                batch = []
+        Note.objects.bulk_create(batch)
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100_000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--vocabulary', type=int, default=20_000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_note')
+    from django.db.models import Q
+
+    from notes.models import Note
+    from notes.search import search_notes
+
+    rnd = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rnd)
+    with test_database():
+        users = seed(args.notes, args.users, vocabulary, rnd)
+        # Ищем как частые, так и редкие слова.
+        queries = [
+            (rnd.choice(users), rnd.choice(vocabulary[0][:1000]))
+            for _ in range(args.queries)
+        ]
+
+        def run_fts():
+            for user, word in queries:
+                list(search_notes(user, word))
+
+        def run_icontains():
+            for user, word in queries:
+                list(Note.objects.filter(
+                    Q(title__icontains=word) | Q(text__icontains=word),
+                    author=user,
+                ).only('id', 'slug', 'title')[:50])
+
+        print(f'notes={args.notes} users={args.users} '
+              f'queries={args.queries}')
+        for name, func in (('fts5', run_fts), ('icontains', run_icontains)):
+            result = summary(
+                [total / len(queries) for total in timings(func, 5)]
+            )
+            print(f'{name:>10}: {result["p50"]:.2f} ms per query')
+
+
+if __name__ == '__main__':
+    main()
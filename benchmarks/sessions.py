@@ -0,0 +1,55 @@
+"""SQL-запросы и задержка страницы новости: сессии и пользователь из БД
+против кеша процесса (ya_common/sessions.py и ya_common/auth.py).
+
+Для каждого варианта настроек пользователь входит заново, страница
+запрашивается один раз для прогрева, а затем замеряется.
+
+Запуск: python -m benchmarks.sessions --repeat 200
+"""
+import argparse
+
+from benchmarks.utils import setup_django, test_database
+from benchmarks.views import measure
+
+VARIANTS = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend',
+        ],
+    },
+    'cache': {},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--comments', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from news.models import Comment
+    from news.seed import seed_news
+
+    settings.DEBUG = False
+    with test_database():
+        seed_news(users=10, news=10, comments=args.comments)
+        comment = Comment.objects.select_related('author').first()
+        url = reverse('news:detail', args=(comment.news_id,))
+        author = comment.author
+        for name, overrides in VARIANTS.items():
+            with override_settings(**overrides):
+                client = Client()
+                client.force_login(author)
+                result = measure(client, 'GET', url, None, args.repeat)
+            print(f'{name:>5}: {result["queries"]} SQL-запросов, '
+                  f'p50 {result["p50"]:.2f} мс, p99 {result["p99"]:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
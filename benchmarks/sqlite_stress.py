@@ -0,0 +1,199 @@
+"""Конкурентные читатели и писатели комментариев на файле SQLite.
+
+Сравнивает настройки по умолчанию (yanews.settings) с боевым профилем
+yanews.settings_production: WAL, synchronous=NORMAL, busy_timeout,
+mmap_size, cache_size и CONN_MAX_AGE. Каждый профиль запускается
+в отдельном процессе на новом файле БД.
+
+Профилю по умолчанию задаётся короткий timeout соединения (--timeout):
+с ожиданием в 5 секунд, как в sqlite3 по умолчанию, писатели почти
+всегда дожидаются блокировки, и разница профилей видна только по
+задержкам. С коротким ожиданием она видна и по ошибкам "database is
+locked". Боевой профиль ждёт busy_timeout из SQLITE_PRAGMAS.
+
+Писатель добавляет комментарий, как NewsComment, читатель загружает
+данные главной и страницы новости. Каждая операция обёрнута в сигналы
+начала и конца запроса, поэтому соединения закрываются по CONN_MAX_AGE,
+как на сервере.
+
+Запуск: python -m benchmarks.sqlite_stress --readers 8 --writers 32
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.utils import setup_django, summary, test_database
+
+DEFAULT_PROFILE = 'yanews.settings'
+PROFILES = (DEFAULT_PROFILE, 'yanews.settings_production')
+
+
+def seed(news_count):
+    from django.contrib.auth import get_user_model
+
+    from news.models import News
+
+    User = get_user_model()
+    author = User.objects.create(username='author')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости.')
+        for index in range(news_count)
+    )
+    return author.pk, list(News.objects.values_list('id', flat=True))
+
+
+def as_request(operation):
+    """Выполняет operation между сигналами начала и конца запроса."""
+    from django.core.signals import request_finished, request_started
+
+    request_started.send(sender=None)
+    try:
+        operation()
+    finally:
+        request_finished.send(sender=None)
+
+
+def write_comment(author_pk, news_ids, rnd):
+    from django.db import transaction
+
+    from news.models import Comment
+
+    with transaction.atomic():
+        Comment.objects.create(
+            news_id=rnd.choice(news_ids), author_id=author_pk, text='Текст'
+        )
+
+
+def read_pages(news_ids, rnd):
+    from django.conf import settings
+
+    from news.models import News
+    from news.pagination import paginate_comments
+
+    list(News.objects.only(
+        'id', 'date', 'modified', 'comment_count'
+    )[:settings.NEWS_COUNT_ON_HOME_PAGE])
+    news = News.objects.get(pk=rnd.choice(news_ids))
+    paginate_comments(news.comment_set.select_related('author'))
+
+
+def worker(kind, operation, deadline, results):
+    from django.db import OperationalError, connection
+
+    latencies = []
+    errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            as_request(operation)
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    results.append((kind, latencies, errors))
+
+
+def run_profile(args):
+    """Замер одного профиля; печатает результат в формате JSON."""
+    setup_django('ya_news')
+    from django.conf import settings
+
+    settings.DEBUG = False
+    if args.settings == DEFAULT_PROFILE:
+        options = settings.DATABASES['default'].setdefault('OPTIONS', {})
+        options['timeout'] = args.timeout
+    with TemporaryDirectory() as directory, test_database(
+        str(Path(directory) / 'news.sqlite3')
+    ):
+        author_pk, news_ids = seed(args.news)
+        deadline = time.perf_counter() + args.seconds
+        results = []
+        threads = [
+            threading.Thread(target=worker, args=(
+                'write', lambda rnd=random.Random(index): write_comment(
+                    author_pk, news_ids, rnd
+                ), deadline, results,
+            ))
+            for index in range(args.writers)
+        ] + [
+            threading.Thread(target=worker, args=(
+                'read', lambda rnd=random.Random(-index): read_pages(
+                    news_ids, rnd
+                ), deadline, results,
+            ))
+            for index in range(1, args.readers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    report = {}
+    for kind in ('read', 'write'):
+        latencies = [
+            value for result_kind, values, _ in results
+            if result_kind == kind for value in values
+        ]
+        report[kind] = {
+            'ops_per_second': len(latencies) / args.seconds,
+            'locked_errors': sum(
+                errors for result_kind, _, errors in results
+                if result_kind == kind
+            ),
+            **(summary(latencies) if latencies else {}),
+        }
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=100)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument(
+        '--timeout', type=float, default=0.01,
+        help='Сколько секунд соединение профиля по умолчанию ждёт '
+             'блокировку.',
+    )
+    parser.add_argument('--settings', choices=PROFILES)
+    args = parser.parse_args()
+
+    if args.settings:
+        os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+        run_profile(args)
+        return
+    print(f'readers={args.readers} writers={args.writers} '
+          f'seconds={args.seconds} timeout={args.timeout}')
+    errors = {}
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_stress',
+             *sys.argv[1:], '--settings', profile],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        report = json.loads(output.splitlines()[-1])
+        print(profile)
+        for kind, result in report.items():
+            print(f'  {kind:>5}: {result["ops_per_second"]:8.0f} ops/s, '
+                  f'p99 {result.get("p99", 0):7.1f} ms, '
+                  f'database is locked: {result["locked_errors"]}')
+        errors[profile] = {
+            kind: result['locked_errors'] for kind, result in report.items()
+        }
+    print('Ошибки database is locked (чтение / запись):')
+    for profile, counts in errors.items():
+        print(f'  {profile}: {counts["read"]} / {counts["write"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Время отрисовки шаблонов: обычный профиль против боевого.
+
+В обычном профиле (DEBUG = True) шаблон читается с диска
+и компилируется при каждой отрисовке. В боевом (settings_production)
+работает кешированный загрузчик, а все шаблоны templates/ компилируются
+при запуске воркера (warmup.py); время прогрева тоже замеряется.
+
+Контекст страницы берётся из ответа представления, дальше замеряется
+только render_to_string. Каждый проект и профиль замеряются в своём
+процессе.
+
+Запуск: python -m benchmarks.templates --repeat 500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.utils import setup_django, summary, test_database, timings
+
+PROFILES = {
+    'ya_news': ('yanews.settings', 'yanews.settings_production'),
+    'ya_note': ('yanote.settings', 'yanote.settings_production'),
+}
+
+
+def news_pages():
+    from django.urls import reverse
+
+    from news.models import Comment
+    from news.seed import seed_news
+
+    seed_news(users=10, news=30, comments=300)
+    comment = Comment.objects.select_related('author').first()
+    return comment.author, {
+        'news/home.html': reverse('news:home'),
+        'news/detail.html': reverse('news:detail', args=(comment.news_id,)),
+    }
+
+
+def notes_pages():
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    from notes.seed import seed_notes
+
+    seed_notes(users=10, notes=500)
+    author = get_user_model().objects.order_by('pk').first()
+    return author, {'notes/list.html': reverse('notes:list')}
+
+
+PAGES = {
+    'ya_news': news_pages,
+    'ya_note': notes_pages,
+}
+
+
+def run_profile(project, repeat):
+    """Замер одного профиля; печатает результат в формате JSON."""
+    setup_django(project)
+    from django.conf import settings
+    from django.template.loader import render_to_string
+    from django.test import Client
+
+    from ya_common.warmup import warm_up
+
+    settings.QUERY_BUDGET_RAISE = False
+    start = time.perf_counter()
+    warm_up()
+    report = {'warm_up_ms': (time.perf_counter() - start) * 1000}
+    with test_database():
+        author, pages = PAGES[project]()
+        client = Client()
+        client.force_login(author)
+        for name, url in pages.items():
+            response = client.get(url)
+            context = {
+                key: response.context[key] for key in response.context.keys()
+            }
+            request = response.wsgi_request
+            report[name] = summary(timings(
+                lambda: render_to_string(name, context, request), repeat
+            ))
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--project', choices=PROFILES)
+    args = parser.parse_args()
+
+    if args.project:
+        run_profile(args.project, args.repeat)
+        return
+    for project, profiles in PROFILES.items():
+        for profile in profiles:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.templates',
+                 *sys.argv[1:], '--project', project],
+                env={**os.environ, 'DJANGO_SETTINGS_MODULE': profile},
+                check=True, capture_output=True, text=True,
+            ).stdout
+            report = json.loads(output.splitlines()[-1])
+            print(f'{profile} (прогрев {report.pop("warm_up_ms"):.1f} мс)')
+            for name, result in report.items():
+                print(f'  {name:>17}: p50 {result["p50"]:6.2f} мс, '
+                      f'p99 {result["p99"]:6.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Общие помощники бенчмарков: настройка Django и тестовая БД."""
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from benchmarks import BASE_DIR
+
+PROJECTS = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def setup_django(project):
+    """Подключает проект из корня репозитория и настраивает Django."""
+    import django
+
+    sys.path.insert(0, str(BASE_DIR / project))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', PROJECTS[project])
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Чистая тестовая БД с применёнными миграциями, как в тестах.
+
+    name — файл SQLite вместо БД в памяти, например для замеров
+    с несколькими соединениями.
+    """
+    from django.conf import settings
+    from django.test.utils import (
+        setup_databases, setup_test_environment, teardown_databases,
+        teardown_test_environment,
+    )
+
+    if name:
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = name
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def timings(func, repeat):
+    """Время каждого из repeat вызовов func, в миллисекундах."""
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def summary(values):
+    """Медиана и перцентили в миллисекундах."""
+    values = sorted(values)
+    if len(values) == 1:
+        return {'p50': values[0], 'p90': values[0], 'p99': values[0]}
+    percentiles = statistics.quantiles(values, n=100, method='inclusive')
+    return {
+        'p50': statistics.median(values),
+        'p90': percentiles[89],
+        'p99': percentiles[98],
+    }
@@ -0,0 +1,220 @@
+r"""Задержки и число SQL-запросов всех именованных адресов проектов.
+
+Каждый проект замеряется в своём процессе на тестовой БД, заполненной
+данными заданного объёма. Замеряется каждый маршрут из news.urls и
+notes.urls: GET, а для добавления комментария и заметки — ещё и POST.
+Результат пишется в JSON, чтобы сравнивать прогоны между собой.
+
+Запуск:
+    python -m benchmarks.views --news 10000 --comments 1000000 \
+        --notes 100000 --output views.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import django
+
+from benchmarks.utils import setup_django, summary, test_database
+
+PROJECTS = {
+    'ya_news': 'news.urls',
+    'ya_note': 'notes.urls',
+}
+
+
+def first_user():
+    """Первый пользователь генератора: у него больше всего записей."""
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.order_by('pk').first()
+
+
+def news_cases(args):
+    """Новости и комментарии; возвращает автора и объекты для адресов."""
+    from news.models import Comment, News
+    from news.seed import seed_news
+
+    seed_news(users=args.users, news=args.news, comments=args.comments,
+              seed=args.seed)
+    author = first_user()
+    news = News.objects.first()
+    comment = Comment.objects.create(
+        news=news, author=author, text='Комментарий автора'
+    )
+    return author, {
+        'news:home': [('GET', (), None)],
+        'news:detail': [
+            ('GET', (news.pk,), None),
+            ('POST', (news.pk,), {'text': 'Новый комментарий'}),
+        ],
+        'news:edit': [('GET', (comment.pk,), None)],
+        'news:delete': [('GET', (comment.pk,), None)],
+        'news:api': [('GET', (), None)],
+    }
+
+
+def notes_cases(args):
+    """Заметки пользователей; возвращает автора и объекты для адресов."""
+    from notes.models import Note
+    from notes.seed import WORDS, seed_notes
+
+    seed_notes(users=args.users, notes=args.notes, seed=args.seed)
+    author = first_user()
+    note = Note.objects.filter(author=author).first()
+    return author, {
+        'notes:home': [('GET', (), None)],
+        'notes:add': [
+            ('GET', (), None),
+            ('POST', (), {'title': 'Новая заметка', 'text': 'Текст'}),
+        ],
+        'notes:edit': [('GET', (note.slug,), None)],
+        'notes:detail': [('GET', (note.slug,), None)],
+        'notes:delete': [('GET', (note.slug,), None)],
+        'notes:list': [('GET', (), None)],
+        'notes:search': [('GET', (), {'q': WORDS[0]})],
+        'notes:export': [('GET', (), None)],
+        'notes:import': [('GET', (), None)],
+        'notes:success': [('GET', (), None)],
+    }
+
+
+SEEDERS = {
+    'ya_news': news_cases,
+    'ya_note': notes_cases,
+}
+
+
+def url_names(urlconf):
+    """Имена всех маршрутов модуля urls с пространством имён."""
+    module = __import__(urlconf, fromlist=['urlpatterns'])
+    return [
+        f'{module.app_name}:{pattern.name}'
+        for pattern in module.urlpatterns if pattern.name
+    ]
+
+
+def measure(client, method, url, data, repeat):
+    """
+    Задержки запроса и число SQL-запросов в нём.
+
+    Запросы считаются обёрткой execute_wrapper, как в QueryBudgetMiddleware:
+    CaptureQueriesContext теряет их, когда request_started очищает лог.
+    Точки сохранения не считаются.
+    """
+    from django.db import connection
+
+    from ya_common.middleware import SAVEPOINT_STATEMENTS
+
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        if not sql.startswith(SAVEPOINT_STATEMENTS):
+            queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def request():
+        response = getattr(client, method.lower())(url, data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    response = request()
+    with connection.execute_wrapper(count_query):
+        request()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        request()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        'method': method,
+        'status': response.status_code,
+        'queries': len(queries),
+        **summary(latencies),
+    }
+
+
+def run_project(project, args):
+    setup_django(project)
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    settings.DEBUG = False
+    settings.QUERY_BUDGET_RAISE = False
+    # Замеряется только сам запрос: фоновая модерация в том же процессе
+    # писала бы в общую БД в памяти одновременно с ним.
+    settings.COMMENT_MODERATION_MODE = 'command'
+    with test_database(args.database):
+        start = time.perf_counter()
+        author, cases = SEEDERS[project](args)
+        seed_seconds = time.perf_counter() - start
+        missing = set(url_names(PROJECTS[project])) - set(cases)
+        if missing:
+            raise SystemExit(f'Нет замера для маршрутов: {sorted(missing)}')
+        client = Client()
+        client.force_login(author)
+        results = {}
+        for name, requests in cases.items():
+            for method, url_args, data in requests:
+                url = reverse(name, args=url_args)
+                results[f'{method} {name}'] = measure(
+                    client, method, url, data, args.repeat
+                )
+    return {'seed_seconds': seed_seconds, 'views': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=20_000)
+    parser.add_argument('--notes', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--database', help='Файл SQLite вместо БД в памяти.'
+    )
+    parser.add_argument('--project', choices=PROJECTS)
+    parser.add_argument('--output', help='Файл JSON; по умолчанию stdout.')
+    args = parser.parse_args()
+
+    if args.project:
+        print(json.dumps(run_project(args.project, args)))
+        return
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sizes': {
+            name: getattr(args, name)
+            for name in ('news', 'comments', 'notes', 'users')
+        },
+        'repeat': args.repeat,
+        'projects': {},
+    }
+    for project in PROJECTS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.views',
+             *sys.argv[1:], '--project', project, '--output', os.devnull],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        report['projects'][project] = json.loads(output.splitlines()[-1])
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Параллельный запуск тестов YaNews и YaNote.
+
+Делает то же, что run_tests.sh: flake8, затем structure_test.py, затем
+тесты обоих проектов, но тесты проектов идут одновременно. Тесты
+каждого проекта делятся на части по тестовым функциям (параметры одной
+функции остаются вместе), и каждая часть запускается отдельным
+процессом pytest со своим DJANGO_SETTINGS_MODULE. Тестовые БД SQLite
+у каждого процесса свои: YaNews создаёт их в памяти, а YaNote — в файле
+с номером процесса в имени.
+
+Отчёты JUnit XML частей собираются в один; при падении печатается
+вывод упавших частей и то же сообщение, что у run_tests.sh.
+
+Запуск: python run_tests.py [--jobs 4] [--junitxml report.xml]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from xml.etree import ElementTree
+
+BASE_DIR = Path(__file__).resolve().parent
+
+Project = namedtuple('Project', ('title', 'path', 'settings'))
+ShardResult = namedtuple('ShardResult', ('project', 'status', 'output'))
+
+PROJECTS = (
+    Project('YaNews', BASE_DIR / 'ya_news', 'yanews.settings_test'),
+    Project('YaNote', BASE_DIR / 'ya_note', 'yanote.settings_test'),
+)
+FLAKE8_FAILED = (
+    ' flake8 обнаружил отклонения от стандартов, '
+    'приведите код в соответствие с PEP8 '
+)
+FLAKE8_PASSED = ' flake8 завершил проверку кода, ошибок не обнаружено '
+STRUCTURE_FAILED = (
+    ' Убедитесь, что написанные вами тесты скопированы '
+    'в указанные в ТЗ директории '
+)
+TESTS_FAILED = (
+    ' При запуске упали ваши тесты для проекта {title}. '
+    'Проверьте тесты этого проекта '
+)
+# Без addopts из pytest.ini: -vv мешает получить список тестов.
+COLLECT_OPTIONS = (
+    '-o', 'addopts=', '-p', 'no:cacheprovider', '--collect-only', '-q',
+)
+
+
+def print_message(message, symbol, error=False):
+    """Строка message на всю ширину терминала, как в run_tests.sh."""
+    width = shutil.get_terminal_size().columns
+    color = '\033[0;31m' if error else '\033[0;32m'
+    print(f'\n{color}{message.center(width, symbol)}\033[0m')
+
+
+def project_env(project):
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = project.settings
+    return env
+
+
+def pytest(project, *args, **kwargs):
+    return subprocess.run(
+        [sys.executable, '-m', 'pytest', *args],
+        cwd=project.path, env=project_env(project),
+        capture_output=True, text=True, **kwargs,
+    )
+
+
+def collect(project):
+    """Тестовые функции проекта без параметров, в порядке сбора."""
+    result = pytest(project, *COLLECT_OPTIONS)
+    if result.returncode:
+        raise RuntimeError(result.stdout + result.stderr)
+    node_ids = [line for line in result.stdout.splitlines() if '::' in line]
+    return list(dict.fromkeys(
+        node_id.partition('[')[0] for node_id in node_ids
+    )), node_ids
+
+
+def split(functions, node_ids, count):
+    """Делит функции на count частей с близким числом тестов."""
+    sizes = dict.fromkeys(functions, 0)
+    for node_id in node_ids:
+        sizes[node_id.partition('[')[0]] += 1
+    shards = [[] for _ in range(min(count, len(functions)))]
+    totals = [0] * len(shards)
+    for function in sorted(functions, key=sizes.get, reverse=True):
+        index = totals.index(min(totals))
+        shards[index].append(function)
+        totals[index] += sizes[function]
+    # Внутри части тесты идут в порядке сбора.
+    order = {function: index for index, function in enumerate(functions)}
+    return [sorted(shard, key=order.get) for shard in shards]
+
+
+def run_shard(project, functions, report):
+    result = pytest(
+        project, '--tb=line', f'--junitxml={report}', *functions
+    )
+    return ShardResult(project, result.returncode,
+                       result.stdout + result.stderr)
+
+
+def merge_reports(reports):
+    """Сводный JUnit XML: по одному testsuite на проект."""
+    merged = ElementTree.Element('testsuites')
+    totals = {}
+    for project, paths in reports.items():
+        suite = ElementTree.SubElement(merged, 'testsuite', name=project.title)
+        counts = dict.fromkeys(
+            ('tests', 'failures', 'errors', 'skipped'), 0
+        )
+        duration = 0.0
+        for path in paths:
+            if not path.exists():
+                continue
+            for part in ElementTree.parse(path).getroot().iter('testsuite'):
+                for key in counts:
+                    counts[key] += int(part.get(key, 0))
+                duration = max(duration, float(part.get('time', 0)))
+                suite.extend(part.findall('testcase'))
+        suite.attrib.update({key: str(value) for key, value in counts.items()})
+        suite.set('time', f'{duration:.3f}')
+        totals[project] = counts
+    return ElementTree.ElementTree(merged), totals
+
+
+def run_projects(jobs, junitxml):
+    """Запускает тесты проектов; возвращает код выхода первого упавшего."""
+    with TemporaryDirectory() as directory, ThreadPoolExecutor(
+        max_workers=jobs * len(PROJECTS)
+    ) as executor:
+        collected = dict(zip(PROJECTS, executor.map(collect, PROJECTS)))
+        reports = {project: [] for project in PROJECTS}
+        futures = []
+        for project, (functions, node_ids) in collected.items():
+            for index, shard in enumerate(split(functions, node_ids, jobs)):
+                report = Path(directory) / f'{project.path.name}-{index}.xml'
+                reports[project].append(report)
+                futures.append(
+                    executor.submit(run_shard, project, shard, report)
+                )
+        results = [future.result() for future in futures]
+        tree, totals = merge_reports(reports)
+    if junitxml:
+        tree.write(junitxml, encoding='utf-8', xml_declaration=True)
+    for project, counts in totals.items():
+        print(f'{project.title}: тестов {counts["tests"]}, '
+              f'упало {counts["failures"] + counts["errors"]}, '
+              f'пропущено {counts["skipped"]}', file=sys.stderr)
+    for project in PROJECTS:
+        failed = [
+            result for result in results
+            if result.project == project and result.status
+        ]
+        if failed:
+            for result in failed:
+                print(result.output, file=sys.stderr)
+            print_message(
+                TESTS_FAILED.format(title=project.title), '=', error=True
+            )
+            print('```', file=sys.stderr)
+            return failed[0].status
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=os.cpu_count() or 1,
+        help='На сколько процессов делить тесты каждого проекта.',
+    )
+    parser.add_argument('--junitxml', help='Файл для сводного отчёта.')
+    args = parser.parse_args()
+
+    flake8 = subprocess.run(
+        [sys.executable, '-m', 'flake8', '--config=setup.cfg'],
+        cwd=BASE_DIR, stdout=sys.stderr,
+    )
+    if flake8.returncode:
+        print_message(FLAKE8_FAILED, '=', error=True)
+        print('```', file=sys.stderr)
+        return flake8.returncode
+    print_message(FLAKE8_PASSED, '=')
+    structure = subprocess.run(
+        [sys.executable, 'structure_test.py'], cwd=BASE_DIR
+    )
+    if structure.returncode:
+        print_message(STRUCTURE_FAILED, '=', error=True)
+        print('```', file=sys.stderr)
+        return structure.returncode
+    start = time.perf_counter()
+    status = run_projects(max(args.jobs, 1), args.junitxml)
+    print(f'Время тестов: {time.perf_counter() - start:.1f} с',
+          file=sys.stderr)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""Общие модули проектов YaNews и YaNote.
+
+Пакеты настроек yanews и yanote добавляют корень репозитория в sys.path,
+поэтому пакет импортируется как ya_common в обоих проектах.
+"""
@@ -0,0 +1,46 @@
+"""Пользователь запроса из кеша процесса вместо запроса к БД.
+
+AuthenticationMiddleware загружает пользователя сессии на каждом
+запросе. CachedModelBackend хранит загруженных пользователей в словаре
+процесса не дольше settings.USER_CACHE_TTL секунд и не больше
+settings.USER_CACHE_SIZE записей. Сохранение или удаление пользователя
+сбрасывает его запись в этом процессе; другие процессы увидят
+изменения по истечении TTL.
+"""
+import time
+from copy import copy
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# pk пользователя -> (время устаревания, пользователь).
+cached_users = {}
+cache_lock = Lock()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_user(sender, instance, **kwargs):
+    cached_users.pop(instance.pk, None)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя из кеша процесса."""
+
+    def get_user(self, user_id):
+        now = time.monotonic()
+        expires, user = cached_users.get(user_id, (now, None))
+        if expires <= now:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            with cache_lock:
+                if len(cached_users) >= settings.USER_CACHE_SIZE:
+                    # Словарь помнит порядок вставки: вытесняем старую.
+                    cached_users.pop(next(iter(cached_users)), None)
+                cached_users[user_id] = (now + settings.USER_CACHE_TTL, user)
+        # Запрос получает свою копию: его изменения не попадут в кеш.
+        return copy(user)
@@ -0,0 +1,139 @@
+"""Учёт SQL-запросов, выполненных при обработке запроса."""
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Точки сохранения транзакций не читают и не пишут данные: в тестах
+# их порождает каждый atomic(), а в бою — только вложенные atomic().
+SAVEPOINT_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO')
+
+
+# Счётчик текущего HTTP-запроса. Под ASGI запросы к БД выполняются
+# в потоках sync_to_async, куда контекстная переменная переходит вместе
+# с запросом, поэтому счётчик не нужно передавать явно.
+current_counter = ContextVar('query_counter', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Страница выполнила больше SQL-запросов, чем ей разрешено."""
+
+
+class QueryCounter:
+    """
+    Обёртка для connection.execute_wrapper: считает запросы и время.
+
+    Команды точек сохранения не считаются.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(SAVEPOINT_STATEMENTS):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def count_query(execute, sql, params, many, context):
+    """Обёртка execute_wrapper: передаёт запрос счётчику текущего запроса."""
+    counter = current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    """
+    Подключает count_query к соединению, если его там ещё нет.
+
+    Обёртка встаёт первой: connection.execute_wrapper() снимает
+    свою обёртку с конца списка и не должна снять нашу.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def install_query_counters(**kwargs):
+    for connection in connections.all():
+        install_query_counter(connection)
+
+
+# Новые соединения и соединения потока, который начал обрабатывать
+# запрос, сразу считают свои запросы.
+connection_created.connect(install_query_counter)
+request_started.connect(install_query_counters)
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает запросы ко всем БД и сверяет их с бюджетом страницы.
+
+    Бюджеты задаются в settings.QUERY_BUDGETS по имени маршрута
+    (например, 'news:detail'). Превышение пишется в лог, а при
+    settings.QUERY_BUDGET_RAISE приводит к исключению QueryBudgetExceeded.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            # Так Django распознаёт асинхронный экземпляр middleware.
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        self.check_budget(request, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        self.check_budget(request, counter)
+        return response
+
+    def check_budget(self, request, counter):
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        logger.debug(
+            '%s %s (%s): %d queries in %.1f ms',
+            request.method, request.path, view_name,
+            counter.count, counter.duration * 1000,
+        )
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or counter.count <= budget:
+            return
+        message = (
+            f'{request.method} {request.path} ({view_name}): '
+            f'{counter.count} queries in {counter.duration * 1000:.1f} ms, '
+            f'budget is {budget}'
+        )
+        logger.warning(message)
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
@@ -0,0 +1,102 @@
+"""Чтение с реплик БД на страницах, которые только читают данные.
+
+GET-запросы к страницам из settings.REPLICA_VIEWS читают с одной из
+реплик settings.DATABASE_REPLICAS. Запись всегда идёт в default, и
+после первой записи запрос дочитывает данные тоже из default.
+
+Реплика может отставать от основной БД, поэтому после запроса
+с записью (POST и т. п.) браузер получает cookie и следующие
+settings.REPLICA_PIN_SECONDS секунд читает только из default:
+например, страница после редиректа сразу покажет изменения.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PIN_COOKIE = 'read_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Состояние текущего HTTP-запроса; вне запросов всё читается из default.
+current_routing = ContextVar('replica_routing', default=None)
+
+
+class Routing:
+    """С какой реплики читает запрос и была ли в нём запись."""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """Роутер БД: чтение с реплики текущего запроса, запись — в default."""
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if routing is None or routing.wrote:
+            return None
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default, объекты из них можно связывать.
+        return True
+
+
+class ReplicaMiddleware:
+    """Выбирает реплику для запроса и закрепляет default после записи."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            # Так Django распознаёт асинхронный экземпляр middleware.
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = current_routing.set(Routing())
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.pin_primary(request, response)
+
+    async def __acall__(self, request):
+        token = current_routing.set(Routing())
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.pin_primary(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and PIN_COOKIE not in request.COOKIES
+        ):
+            current_routing.get().replica = random.choice(
+                settings.DATABASE_REPLICAS
+            )
+
+    def pin_primary(self, request, response):
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,67 @@
+"""Общие помощники команд seed: пачки, веса, тексты и пользователи.
+
+Данные детерминированы: один и тот же генератор random.Random даёт те же
+строки. Объекты строятся по ходу вставки и вставляются пачками, поэтому
+память не растёт с объёмом данных.
+"""
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+
+# Сколько слов в корпусе, из которого режутся тексты.
+CORPUS_WORDS = 200_000
+
+
+def batched(objects, size):
+    objects = iter(objects)
+    while batch := list(islice(objects, size)):
+        yield batch
+
+
+def zipf_weights(count):
+    """Накопленные веса для random.choices: у k-го элемента вес 1/k."""
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+class TextSource:
+    """Тексты заданной длины — срезы заранее собранного корпуса слов."""
+
+    def __init__(self, rnd, words):
+        self.rnd = rnd
+        self.vocabulary = words
+        self.corpus = ' '.join(rnd.choices(words, k=CORPUS_WORDS))
+
+    def words(self, count):
+        return ' '.join(self.rnd.choices(self.vocabulary, k=count))
+
+    def text(self, median, sigma, max_length):
+        length = min(
+            max(int(self.rnd.lognormvariate(0, sigma) * median), 1),
+            max_length, len(self.corpus),
+        )
+        start = self.rnd.randrange(len(self.corpus) - length + 1)
+        return self.corpus[start:start + length].strip().capitalize() or '.'
+
+
+def seed_users(count, seed, batch_size):
+    """Пользователи seed<seed>-<номер>; существующие не дублируются."""
+    User = get_user_model()
+    prefix = f'seed{seed}-'
+    for batch in batched(range(count), batch_size):
+        with transaction.atomic():
+            User.objects.bulk_create(
+                (
+                    User(
+                        username=f'{prefix}{index}',
+                        password=UNUSABLE_PASSWORD_PREFIX,
+                    )
+                    for index in batch
+                ),
+                ignore_conflicts=True,
+            )
+    return list(
+        User.objects.filter(username__startswith=prefix)
+        .order_by('pk').values_list('pk', flat=True)[:count]
+    )
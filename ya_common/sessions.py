@@ -0,0 +1,39 @@
+"""Сессии в локальном кеше процесса поверх таблицы сессий.
+
+Движок cached_db: сессия читается из кеша settings.SESSION_CACHE_ALIAS,
+а при промахе — из БД; запись идёт и в БД, и в кеш. Кеш у каждого
+процесса свой (locmem), поэтому выход из аккаунта в одном процессе
+другие процессы увидят, только когда их запись устареет. Запись
+хранится не дольше settings.SESSION_CACHE_TTL секунд, а не весь срок
+жизни сессии, как в cached_db.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+
+    def cache_timeout(self, **kwargs):
+        return min(self.get_expiry_age(**kwargs), settings.SESSION_CACHE_TTL)
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            # Как в cached_db: некорректный ключ сбрасывает сессию.
+            data = None
+        if data is None:
+            session = self._get_session_from_db()
+            if not session:
+                return {}
+            data = self.decode(session.session_data)
+            self._cache.set(
+                self.cache_key, data,
+                self.cache_timeout(expiry=session.expire_date),
+            )
+        return data
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        # cached_db кладёт сессию в кеш на весь срок жизни: сокращаем.
+        self._cache.set(self.cache_key, self._session, self.cache_timeout())
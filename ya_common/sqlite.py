@@ -0,0 +1,42 @@
+"""Настройка новых соединений с SQLite командами PRAGMA.
+
+Команды берутся из settings.SQLITE_PRAGMAS и выполняются напрямую
+в соединении sqlite3, минуя обёртки Django: они не попадают в лог
+запросов и не расходуют бюджет запросов страницы.
+
+full_scans проверяет в тестах планы запросов SQLite.
+"""
+from django.conf import settings
+from django.db import connection
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Обработчик connection_created."""
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def full_scans(queries):
+    """
+    Строки планов запросов, в которых таблица читается целиком.
+
+    queries — записи вида connection.queries. SCAN допустим, только
+    если идёт по индексу в нужном порядке и запрос ограничен LIMIT:
+    тогда читаются лишь первые строки индекса.
+    """
+    scans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            bounded = ' LIMIT ' in query['sql']
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            scans += [
+                (query['sql'], detail)
+                for *_, detail in cursor.fetchall()
+                if detail.startswith('SCAN')
+                and not (bounded and ' USING ' in detail)
+            ]
+    return scans
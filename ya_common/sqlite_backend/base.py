@@ -0,0 +1,41 @@
+"""Бэкенд SQLite с выбором режима транзакций.
+
+Обычный бэкенд начинает транзакцию с BEGIN (DEFERRED): блокировка
+записи берётся только первой пишущей командой. Если до этого
+транзакция успела прочитать данные, SQLite не ждёт освобождения
+блокировки (busy_timeout), а сразу отвечает "database is locked":
+ожидание могло бы привести к взаимной блокировке. Так ведёт себя
+и вставка в notes_note — триггер FTS5 читает настройки индекса
+раньше, чем берётся блокировка записи.
+
+OPTIONS['transaction_mode'] задаёт режим BEGIN, как одноимённая
+настройка бэкенда в Django 5.1: с IMMEDIATE блокировка записи берётся
+сразу, и параллельные транзакции ждут друг друга.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def transaction_mode(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                'settings.DATABASES is improperly configured. '
+                f'transaction_mode must be one of {TRANSACTION_MODES}.'
+            )
+        return mode and mode.upper()
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
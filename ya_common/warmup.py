@@ -0,0 +1,39 @@
+"""Прогрев процесса при запуске воркера WSGI или ASGI.
+
+С кешированным загрузчиком шаблонов (settings_production проекта)
+каждый шаблон компилируется один раз за жизнь процесса — но при первом
+запросе, который его использует. warm_up компилирует заранее все
+шаблоны из каталогов DIRS (templates/), включая base.html и includes/,
+а также заполняет таблицу обратного разрешения адресов, которой
+пользуется {% url %}. Включается настройкой WARM_UP_ON_START.
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+
+
+def template_names(directory):
+    directory = Path(directory)
+    return sorted(
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob('*.html')
+    )
+
+
+def warm_up():
+    """Компилирует шаблоны проекта; возвращает их число."""
+    if not settings.WARM_UP_ON_START:
+        return 0
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            for name in template_names(directory):
+                engine.get_template(name)
+                count += 1
+    get_resolver().reverse_dict
+    return count
@@ -0,0 +1,102 @@
+"""Счётчики активности новости: число комментариев и время последнего.
+
+Учитываются только одобренные комментарии.
+
+Они хранятся в самой новости, поэтому страницы и ленты показывают
+активность без запросов к комментариям. При создании и удалении
+комментария сигналы обновляют их выражениями F(), после
+Comment.objects.bulk_create — пересчётом по таблице комментариев.
+Без внешней транзакции вставка фиксируется ещё до сигнала post_save,
+поэтому представления сохраняют комментарий в transaction.atomic() —
+так же, как это делает админка. Удаление вместе с сигналами Django
+и так выполняет в одной транзакции.
+recompute_activity пересчитывает все новости, например после загрузки
+комментариев в обход ORM.
+
+Вместе со счётчиками обновляется и News.modified: по нему страницы
+отвечают на запросы с одним If-Modified-Since, а время последнего
+комментария после удаления может уменьшиться.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Comment, News
+
+
+def comment_count():
+    """Подзапрос: количество комментариев новости."""
+    return Coalesce(Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk'), status=Comment.Status.APPROVED
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def last_comment_created():
+    """Подзапрос: время последнего комментария новости."""
+    return Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk'), status=Comment.Status.APPROVED
+        ).order_by('-created', '-id').values('created')[:1]
+    )
+
+
+def comment_added(comment):
+    # Greatest: параллельные комментарии могут обновить новость
+    # не в том порядке, в котором были созданы.
+    created = Value(comment.created)
+    News.objects.filter(pk=comment.news_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=Greatest(
+            Coalesce('last_comment_at', created), created
+        ),
+        modified=timezone.now(),
+    )
+
+
+def comment_deleted(comment):
+    News.objects.filter(pk=comment.news_id).update(
+        comment_count=Greatest(F('comment_count') - 1, Value(0)),
+        last_comment_at=last_comment_created(),
+        modified=timezone.now(),
+    )
+
+
+def refresh_activity(news_ids):
+    """Пересчитывает счётчики новостей news_ids одним UPDATE."""
+    News.objects.filter(pk__in=news_ids).update(
+        comment_count=comment_count(),
+        last_comment_at=last_comment_created(),
+        modified=timezone.now(),
+    )
+
+
+def recompute_activity(batch_size=None, queryset=None):
+    """
+    Пересчитывает счётчики новостей, пачками по порядку id.
+
+    queryset — какие новости пересчитать, по умолчанию все. Каждая
+    пачка — один UPDATE в своей транзакции, поэтому пересчёт не держит
+    блокировку на всю таблицу. Возвращает число новостей.
+    """
+    batch_size = batch_size or settings.NEWS_ACTIVITY_BATCH_SIZE
+    if queryset is None:
+        queryset = News.objects.all()
+    last_pk = 0
+    total = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return total
+        with transaction.atomic():
+            refresh_activity(pks)
+        total += len(pks)
+        last_pk = pks[-1]
@@ -1,15 +1,62 @@
+from django.conf import settings
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
 from .models import Comment, News
 
 
+class LatestCommentsFormSet(BaseInlineFormSet):
+    """Только последние комментарии новости, а не все тысячи."""
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset().select_related(
+                'author'
+            ).order_by('-created', '-id')[
+                :settings.NEWS_ADMIN_INLINE_COMMENTS
+            ]
+        return self._queryset
+
+
 class CommentInline(admin.StackedInline):
     model = Comment
+    formset = LatestCommentsFormSet
     extra = 0
+    # Автор только для чтения: виджет выбора делал бы запрос на каждую
+    # форму. Новые комментарии добавляются на странице комментариев.
+    fields = ('text', 'author', 'created')
+    readonly_fields = ('author', 'created')
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date', 'comment_count', 'last_comment_at')
+    readonly_fields = ('comment_count', 'last_comment_at', 'all_comments')
+    date_hierarchy = 'date'
+    # Без COUNT(*) по всей таблице на каждой странице списка.
+    show_full_result_count = False
     inlines = [
         CommentInline,
     ]
+
+    @admin.display(description='Комментарии')
+    def all_comments(self, news):
+        return format_html(
+            '<a href="{}?news__id__exact={}">Все комментарии ({})</a>',
+            reverse('admin:news_comment_changelist'),
+            news.pk,
+            news.comment_count,
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    show_full_result_count = False
@@ -0,0 +1,121 @@
+"""Лента новостей в JSON для мобильных клиентов.
+
+GET /api/news/?fields=title,date&limit=20&before=<курсор>
+
+Новости идут от новых к старым по индексу на паре (date, id),
+курсор — ключ последней новости страницы, без OFFSET. Параметр
+fields выбирает поля: из БД читаются только они, поэтому текст
+новости загружается, только если его запросили. Число комментариев
+берётся из счётчика в самой новости (news/activity.py).
+
+Страница читается из БД одним запросом до отправки ответа, а JSON
+отдаётся частями, по объекту, без шаблонов.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+from django.views import generic
+
+from .models import News
+from .pagination import MAX_PK
+
+FIELDS = (
+    'id', 'title', 'excerpt', 'text', 'date', 'comment_count',
+    'last_comment_at',
+)
+DEFAULT_FIELDS = ('id', 'title', 'excerpt', 'date', 'comment_count')
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+class BadRequest(Exception):
+    """Некорректные параметры запроса к ленте."""
+
+
+def encode_cursor(news):
+    """Курсор вида `<дата>.<id>`."""
+    return f'{news["date"].isoformat()}.{news["id"]}'
+
+
+def older_than(cursor):
+    try:
+        day, pk = cursor.split('.')
+        day, pk = date.fromisoformat(day), int(pk)
+        if not 0 <= pk <= MAX_PK:
+            raise ValueError(pk)
+    except (ValueError, OverflowError):
+        raise BadRequest('Некорректный курсор.')
+    return Q(date__lt=day) | Q(date=day, pk__lt=pk)
+
+
+def parse_fields(value):
+    """Запрошенные поля; id есть всегда."""
+    if not value:
+        return DEFAULT_FIELDS
+    fields = ['id']
+    for field in value.split(','):
+        if field not in FIELDS:
+            raise BadRequest(f'Неизвестное поле: {field}.')
+        if field not in fields:
+            fields.append(field)
+    return tuple(fields)
+
+
+def parse_limit(value):
+    if not value:
+        return settings.NEWS_API_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise BadRequest('Некорректный limit.')
+    return max(1, min(limit, settings.NEWS_API_MAX_PAGE_SIZE))
+
+
+def stream_page(rows, fields, next_url):
+    yield '{"results": ['
+    for index, row in enumerate(rows):
+        if index:
+            yield ', '
+        yield encoder.encode({field: row[field] for field in fields})
+    yield f'], "next": {encoder.encode(next_url)}}}'
+
+
+class NewsFeed(generic.View):
+    """Страница ленты новостей в JSON."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = parse_fields(request.GET.get('fields'))
+            limit = parse_limit(request.GET.get('limit'))
+            queryset = News.objects.all()
+            if request.GET.get('before'):
+                queryset = queryset.filter(
+                    older_than(request.GET['before'])
+                )
+        except BadRequest as error:
+            return JsonResponse(
+                {'error': str(error)}, status=400,
+                json_dumps_params={'ensure_ascii': False},
+            )
+        # values() читает только нужные столбцы, как only(), но без
+        # создания объектов модели; date и id нужны для курсора.
+        rows = list(
+            queryset.order_by('-date', '-id').values(
+                *dict.fromkeys((*fields, 'date'))
+            )[:limit + 1]
+        )
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            query = {key: request.GET[key] for key in ('fields', 'limit')
+                     if request.GET.get(key)}
+            query['before'] = encode_cursor(rows[-1])
+            next_url = f'{request.path}?{urlencode(query)}'
+        return StreamingHttpResponse(
+            stream_page(rows, fields, next_url),
+            content_type='application/json',
+        )
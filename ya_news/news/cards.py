@@ -0,0 +1,60 @@
+"""Кеш HTML-карточек новостей для главной страницы.
+
+Карточка хранится вместе с временем изменения новости и количеством
+комментариев, для которых она отрисована: если что-то из них
+изменилось, карточка рисуется заново. Кеш у каждого процесса свой,
+а сигналы сбрасывают его только в процессе, где изменили новость;
+остальные процессы замечают изменение по News.modified.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import News
+
+CARD_TEMPLATE = 'news/card.html'
+
+
+def card_cache_key(news_pk):
+    return f'news:card:{news_pk}'
+
+
+def invalidate_news_card(news_pk):
+    cache.delete(card_cache_key(news_pk))
+
+
+def render_news_cards(news_list):
+    """
+    Возвращает HTML карточек в порядке news_list.
+
+    У новостей в news_list должны быть загружены pk, modified и
+    comment_count, остальные поля читаются из БД одним запросом только
+    для промахов кеша.
+    Полный текст новости карточке не нужен: в ней отрывок.
+    """
+    keys = {news.pk: card_cache_key(news.pk) for news in news_list}
+    cached = cache.get_many(keys.values())
+    cards = {}
+    missing = []
+    for news in news_list:
+        version, html = cached.get(keys[news.pk], (None, None))
+        if version == (news.modified, news.comment_count):
+            cards[news.pk] = html
+        else:
+            missing.append(news)
+    if missing:
+        full_news = News.objects.defer('text').in_bulk(
+            [news.pk for news in missing]
+        )
+        fresh = {}
+        for news in missing:
+            card_news = full_news[news.pk]
+            card_news.comment_count = news.comment_count
+            html = render_to_string(CARD_TEMPLATE, {'news': card_news})
+            cards[news.pk] = html
+            fresh[keys[news.pk]] = (
+                (news.modified, news.comment_count), html
+            )
+        cache.set_many(fresh, settings.NEWS_CARD_CACHE_TIMEOUT)
+    return [mark_safe(cards[news.pk]) for news in news_list]
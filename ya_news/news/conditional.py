@@ -0,0 +1,60 @@
+"""Условные GET-запросы к страницам новостей.
+
+Страница зависит не только от данных в БД, но и от зрителя
+(форма комментария, кнопки у своих комментариев) и от параметров
+адреса (страница комментариев), поэтому всё это входит в ETag.
+Ответ 304 отдаётся до отрисовки шаблона.
+"""
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def page_etag(request, *parts):
+    """Вычисляет ETag страницы по данным parts, адресу и пользователю."""
+    user = request.user
+    viewer = user.pk if user.is_authenticated else None
+    data = '|'.join(
+        str(part) for part in (*parts, request.get_full_path(), viewer)
+    )
+    return '"%s"' % md5(data.encode()).hexdigest()
+
+
+def conditional_response(request, etag, last_modified, render):
+    """
+    Отвечает 304, если у клиента актуальная страница, иначе вызывает render.
+
+    Страница своя у каждого пользователя, поэтому браузер не хранит её
+    в общих кешах и перепроверяет при каждом показе.
+    """
+    timestamp = timestamp_of(last_modified)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = render()
+    return with_validators(response, etag, timestamp)
+
+
+async def aconditional_response(request, etag, last_modified, render):
+    """conditional_response для асинхронных представлений."""
+    timestamp = timestamp_of(last_modified)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = await render()
+    return with_validators(response, etag, timestamp)
+
+
+def timestamp_of(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def with_validators(response, etag, timestamp):
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,47 @@
+"""Заполнение отрывков новостей, сохранённых в обход News.save().
+
+Например, после loaddata или после изменения NEWS_EXCERPT_WORDS.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .cards import card_cache_key
+from .models import News, make_excerpt
+
+
+def backfill_excerpts(batch_size=None, missing_only=True):
+    """
+    Заполняет отрывки пачками по порядку id; возвращает число новостей.
+
+    Тексты бывают большими, поэтому в памяти только одна пачка.
+    Карточки обновлённых новостей удаляются из кеша, а modified
+    обновляется, чтобы страницы с ними не отвечали 304.
+    """
+    batch_size = batch_size or settings.NEWS_EXCERPT_BATCH_SIZE
+    queryset = News.objects.order_by('pk')
+    if missing_only:
+        queryset = queryset.filter(excerpt='')
+    last_pk = 0
+    total = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .values_list('pk', 'text')[:batch_size]
+        )
+        if not rows:
+            return total
+        # bulk_update не заполняет auto_now: время ставим сами.
+        now = timezone.now()
+        with transaction.atomic():
+            News.objects.bulk_update(
+                [
+                    News(pk=pk, excerpt=make_excerpt(text), modified=now)
+                    for pk, text in rows
+                ],
+                ['excerpt', 'modified'],
+            )
+        cache.delete_many([card_cache_key(pk) for pk, _ in rows])
+        total += len(rows)
+        last_pk = rows[-1][0]
@@ -1,6 +1,12 @@
-from django.forms import ModelForm
+from functools import lru_cache
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.forms import ModelForm
 
+from .matcher import BadWordsMatcher, read_words
 from .models import Comment
 
 BAD_WORDS = (
@@ -11,6 +17,29 @@ BAD_WORDS = (
 WARNING = 'Не ругайтесь!'
 
 
+@lru_cache(maxsize=None)
+def get_bad_words_matcher():
+    """
+    Автомат для поиска запрещённых слов, один на процесс.
+
+    К BAD_WORDS добавляются слова из файла BAD_WORDS_FILE, если он задан.
+    """
+    words = list(BAD_WORDS)
+    if settings.BAD_WORDS_FILE:
+        words.extend(read_words(settings.BAD_WORDS_FILE))
+    return BadWordsMatcher(
+        words,
+        whole_words=settings.BAD_WORDS_WHOLE_WORDS,
+        casefold=settings.BAD_WORDS_CASEFOLD,
+    )
+
+
+@receiver(setting_changed)
+def reset_bad_words_matcher(setting, **kwargs):
+    if setting.startswith('BAD_WORDS_'):
+        get_bad_words_matcher.cache_clear()
+
+
 class CommentForm(ModelForm):
 
     class Meta:
@@ -20,8 +49,6 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if get_bad_words_matcher().search(text) is not None:
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from news.excerpts import backfill_excerpts
+
+
+class Command(BaseCommand):
+    help = 'Заполняет отрывки новостей для карточек на главной.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать и уже заполненные отрывки.',
+        )
+
+    def handle(self, *args, **options):
+        total = backfill_excerpts(
+            batch_size=options['batch_size'],
+            missing_only=not options['all'],
+        )
+        self.stdout.write(f'Заполнено отрывков: {total}.')
@@ -0,0 +1,46 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.moderation import process_batch, stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает очередь модерации комментариев пачками. Без --once '
+        'работает постоянно и проверяет очередь раз в --interval секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.COMMENT_MODERATION_WORKERS,
+        )
+        parser.add_argument('--interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь до конца и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                while process_batch(options['batch_size'], executor.map):
+                    pass
+                self.report()
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+
+    def report(self):
+        counters = stats.snapshot()
+        self.stdout.write(
+            f'Одобрено: {counters["approved"]}, '
+            f'отклонено: {counters["rejected"]}, '
+            f'пачек: {counters["batches"]}, '
+            f'в секунду: {counters["per_second"]:.0f}, '
+            f'в очереди: {counters["queue_depth"]}.'
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from news.activity import recompute_activity
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает у новостей число комментариев и время последнего.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        total = recompute_activity(batch_size=options['batch_size'])
+        self.stdout.write(f'Пересчитано новостей: {total}.')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from news.seed import seed_news
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, новости и комментарии '
+        'для замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = seed_news(
+            users=options['users'],
+            news=options['news'],
+            comments=options['comments'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f'Пользователей: {result.users}, новостей: {result.news}, '
+            f'комментариев: {result.comments}.'
+        )
@@ -0,0 +1,93 @@
+"""Поиск запрещённых слов в тексте за один проход.
+
+Словарь компилируется в автомат Ахо — Корасик, поэтому время проверки
+зависит от длины текста и не растёт вместе со словарём.
+"""
+from collections import deque
+
+
+def read_words(path):
+    """Читает словарь из файла: по слову в строке, `#` — комментарий."""
+    with open(path, encoding='utf-8') as words_file:
+        for line in words_file:
+            word = line.split('#', 1)[0].strip()
+            if word:
+                yield word
+
+
+class BadWordsMatcher:
+    """
+    Автомат Ахо — Корасик для набора запрещённых слов.
+
+    `casefold` сравнивает слова без учёта регистра по правилам Unicode,
+    `whole_words` находит слово, только если оно не часть другого слова.
+    """
+
+    def __init__(self, words, whole_words=False, casefold=True):
+        self.whole_words = whole_words
+        self.casefold = casefold
+        self._goto = [{}]
+        self._fail = [0]
+        # Длины слов, которые заканчиваются в узле (с учётом суффиксов).
+        self._lengths = [()]
+        for word in words:
+            word = self._normalize(word.strip())
+            if word:
+                self._add(word)
+        self._build_fail_links()
+
+    @classmethod
+    def from_file(cls, path, **options):
+        return cls(read_words(path), **options)
+
+    def _normalize(self, text):
+        return text.casefold() if self.casefold else text
+
+    def _add(self, word):
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._lengths.append(())
+            node = next_node
+        self._lengths[node] += (len(word),)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._lengths[child] += self._lengths[self._fail[child]]
+
+    def _is_whole_word(self, text, start, end):
+        return (
+            (start == 0 or not text[start - 1].isalnum())
+            and (end == len(text) or not text[end].isalnum())
+        )
+
+    def search(self, text):
+        """Возвращает первое найденное слово или None."""
+        text = self._normalize(text)
+        goto, fail, lengths = self._goto, self._fail, self._lengths
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length in lengths[node]:
+                start, end = index + 1 - length, index + 1
+                if (
+                    not self.whole_words
+                    or self._is_whole_word(text, start, end)
+                ):
+                    return text[start:end]
+        return None
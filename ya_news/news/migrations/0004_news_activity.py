@@ -0,0 +1,43 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_activity(apps, schema_editor):
+    """Заполняет счётчики у существующих новостей одним UPDATE."""
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    comments = Comment.objects.filter(news=OuterRef('pk')).order_by()
+    News.objects.update(
+        comment_count=Coalesce(Subquery(
+            comments.values('news').annotate(
+                count=Count('pk')
+            ).values('count')
+        ), 0),
+        last_comment_at=Subquery(
+            comments.order_by('-created', '-id').values('created')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_activity, migrations.RunPython.noop),
+    ]
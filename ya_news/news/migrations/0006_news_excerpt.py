@@ -0,0 +1,31 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+def fill_excerpts(apps, schema_editor):
+    """Заполняет отрывки у существующих новостей."""
+    from news.models import make_excerpt
+
+    News = apps.get_model('news', 'News')
+    news_list = [
+        News(pk=pk, excerpt=make_excerpt(text))
+        for pk, text in News.objects.values_list('pk', 'text').iterator()
+    ]
+    News.objects.bulk_update(news_list, ['excerpt'], batch_size=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
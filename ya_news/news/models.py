@@ -2,36 +2,158 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.dispatch import Signal
+
+TRUNCATION = ' …'
+
+# Отправляется после Comment.objects.bulk_create, который обходит
+# post_save; news_ids — новости созданных комментариев.
+comments_bulk_created = Signal()
+
+
+def make_excerpt(text, words=None):
+    """
+    Первые words слов текста, как фильтр truncatewords.
+
+    split(maxsplit=...) не делит на слова весь текст: на длинных
+    новостях это основная экономия.
+    """
+    if words is None:
+        words = settings.NEWS_EXCERPT_WORDS
+    parts = text.split(maxsplit=words)
+    if len(parts) <= words:
+        return ' '.join(parts)
+    excerpt = ' '.join(parts[:words])
+    if excerpt.endswith(TRUNCATION):
+        return excerpt
+    return excerpt + TRUNCATION
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create не вызывает save(): заполняем отрывки здесь."""
+        objs = list(objs)
+        for news in objs:
+            news.excerpt = make_excerpt(news.text)
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
+    # Начало текста для карточки на главной, заполняется при сохранении:
+    # так карточке не нужен весь текст.
+    excerpt = models.TextField(blank=True, default='', editable=False)
     date = models.DateField(default=datetime.today)
+    # Время последнего изменения новости или текста её комментариев:
+    # по нему страницы отвечают на условные GET-запросы.
+    modified = models.DateTimeField(auto_now=True)
+    # Активность хранится в новости, см. news/activity.py.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_desc_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Если текст не загружен, он не менялся, и отрывок тоже.
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, update_activity=True, **kwargs):
+        """
+        Счётчики новостей обновляет сигнал comments_bulk_created.
+
+        update_activity=False — без сигнала: счётчики пересчитает
+        вызывающий код, например seed после всех пачек.
+        """
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if update_activity:
+            comments_bulk_created.send(
+                sender=self.model,
+                news_ids={comment.news_id for comment in objs},
+            )
+        return objs
+
 
 class Comment(models.Model):
+
+    class Status(models.TextChoices):
+        # Комментарии с сайта ждут модерации, см. news/moderation.py;
+        # созданные в коде (админка, загрузка данных) видны сразу.
+        PENDING = 'pending', 'На модерации'
+        APPROVED = 'approved', 'Одобрен'
+        REJECTED = 'rejected', 'Отклонён'
+
+    # Отдельные индексы по внешним ключам не нужны:
+    # их покрывают составные индексы из Meta.indexes.
     news = models.ForeignKey(
         News,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        max_length=8, choices=Status.choices, default=Status.APPROVED
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            # Одобренные комментарии новости по порядку
+            # и курсорная пагинация.
+            models.Index(
+                fields=('news', 'status', 'created', 'id'),
+                name='comment_news_status_idx',
+            ),
+            # Очередь модерации по порядку поступления.
+            models.Index(fields=('status', 'id'), name='comment_status_idx'),
+            # Комментарии автора при редактировании и удалении.
+            models.Index(
+                fields=('author', 'id'), name='comment_author_id_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает новость и статус из БД, см. news/signals.py."""
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_activity = instance.activity_key()
+        return instance
+
+    def activity_key(self):
+        """Новость и статус; None, если какое-то из полей не загружено."""
+        if {'news_id', 'status'} & self.get_deferred_fields():
+            return None
+        return self.news_id, self.status
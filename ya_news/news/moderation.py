@@ -0,0 +1,201 @@
+"""Модерация комментариев вне запроса.
+
+Комментарий с сайта сохраняется со статусом «на модерации» и не виден
+на странице новости, пока его не одобрят. Очередь — сами комментарии
+в этом статусе, отдельный брокер не нужен. Её разбирает пул потоков
+процесса (ModerationQueue), который запускается после фиксации
+транзакции с новым комментарием, или команда moderate_comments, если
+settings.COMMENT_MODERATION_MODE = 'command'.
+
+Проверки — функции из settings.COMMENT_MODERATORS: получают комментарий
+и возвращают причину отказа или None. Быстрая проверка запрещённых слов
+остаётся в форме, чтобы автор сразу видел ошибку.
+"""
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .activity import refresh_activity
+from .cards import invalidate_news_card
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+LINK = re.compile(r'https?://|www\.', re.IGNORECASE)
+
+
+def too_many_links(comment):
+    """Отклоняет комментарии, похожие на рекламу ссылками."""
+    if len(LINK.findall(comment.text)) > settings.COMMENT_MAX_LINKS:
+        return 'слишком много ссылок'
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_moderators():
+    return tuple(import_string(path) for path in settings.COMMENT_MODERATORS)
+
+
+@receiver(setting_changed)
+def reset_moderators(setting, **kwargs):
+    if setting == 'COMMENT_MODERATORS':
+        get_moderators.cache_clear()
+
+
+def moderate(comment):
+    """Статус, который комментарий получает после проверок."""
+    for moderator in get_moderators():
+        reason = moderator(comment)
+        if reason is not None:
+            logger.info('Комментарий %s отклонён: %s', comment.pk, reason)
+            return Comment.Status.REJECTED
+    return Comment.Status.APPROVED
+
+
+class ModerationStats:
+    """Счётчики модерации в процессе: сколько разобрано и как быстро."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.batches = self.approved = self.rejected = 0
+            self.busy_seconds = 0.0
+
+    def record(self, approved, rejected, seconds):
+        with self.lock:
+            self.batches += 1
+            self.approved += approved
+            self.rejected += rejected
+            self.busy_seconds += seconds
+
+    def snapshot(self):
+        """Счётчики и текущая длина очереди."""
+        with self.lock:
+            processed = self.approved + self.rejected
+            counters = {
+                'batches': self.batches,
+                'approved': self.approved,
+                'rejected': self.rejected,
+                'per_second': (
+                    processed / self.busy_seconds if self.busy_seconds else 0
+                ),
+            }
+        counters['queue_depth'] = queue_depth()
+        return counters
+
+
+stats = ModerationStats()
+
+
+def queue_depth():
+    return Comment.objects.filter(status=Comment.Status.PENDING).count()
+
+
+def process_batch(batch_size=None, runner=map):
+    """
+    Модерирует пачку самых старых комментариев из очереди.
+
+    runner — функция с интерфейсом map, например Executor.map
+    пула потоков, в котором выполняются проверки. Статус меняется
+    только у комментариев, которые всё ещё ждут модерации, поэтому
+    пачку безопасно разбирать повторно. Возвращает размер пачки.
+    """
+    batch_size = batch_size or settings.COMMENT_MODERATION_BATCH_SIZE
+    start = time.perf_counter()
+    comments = list(
+        Comment.objects.filter(status=Comment.Status.PENDING)
+        .order_by('id')[:batch_size]
+    )
+    if not comments:
+        return 0
+    verdicts = {Comment.Status.APPROVED: [], Comment.Status.REJECTED: []}
+    for comment, status in zip(comments, runner(moderate, comments)):
+        verdicts[status].append(comment)
+    updated = {}
+    with transaction.atomic():
+        for status, moderated in verdicts.items():
+            updated[status] = Comment.objects.filter(
+                pk__in=[comment.pk for comment in moderated],
+                status=Comment.Status.PENDING,
+            ).update(status=status)
+        news_ids = {
+            comment.news_id
+            for comment in verdicts[Comment.Status.APPROVED]
+        }
+        refresh_activity(news_ids)
+    for news_id in news_ids:
+        invalidate_news_card(news_id)
+    stats.record(
+        updated[Comment.Status.APPROVED], updated[Comment.Status.REJECTED],
+        time.perf_counter() - start,
+    )
+    return len(comments)
+
+
+class ModerationQueue:
+    """
+    Разбор очереди в фоне процесса.
+
+    Один фоновый поток читает очередь пачками, а проверки комментариев
+    пачки выполняются в пуле из settings.COMMENT_MODERATION_WORKERS
+    потоков. Поток работает, пока очередь не опустеет.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.draining = False
+        self.pending = False
+
+    def schedule(self):
+        """Запускает разбор очереди, если он ещё не идёт."""
+        with self.lock:
+            if self.draining:
+                # Разбор уже идёт: пусть проверит очередь ещё раз.
+                self.pending = True
+                return
+            self.draining = True
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.COMMENT_MODERATION_WORKERS,
+                    thread_name_prefix='moderation',
+                )
+        threading.Thread(target=self.drain, daemon=True).start()
+
+    def drain(self):
+        try:
+            while True:
+                if process_batch(runner=self.executor.map):
+                    continue
+                with self.lock:
+                    if not self.pending:
+                        self.draining = False
+                        return
+                    self.pending = False
+        except Exception:
+            logger.exception('Ошибка модерации комментариев')
+            with self.lock:
+                self.draining = False
+        finally:
+            connection.close()
+
+
+queue = ModerationQueue()
+
+
+def schedule_moderation():
+    """Передаёт новые комментарии на модерацию после фиксации транзакции."""
+    if settings.COMMENT_MODERATION_MODE == 'threads':
+        transaction.on_commit(queue.schedule)
@@ -0,0 +1,103 @@
+"""Курсорная (keyset) пагинация комментариев к новости.
+
+Страница ищется по индексу на паре (created, id), без OFFSET:
+курсор — это ключ первого или последнего комментария соседней страницы.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+from .models import Comment
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Наибольший id: BigAutoField — знаковое 64-битное целое.
+MAX_PK = 2 ** 63 - 1
+
+CommentPage = namedtuple('CommentPage', ('object_list', 'older', 'newer'))
+
+
+def encode_cursor(created, pk):
+    """Курсор вида `<микросекунды от эпохи>.<id>`."""
+    micros = (created - EPOCH) // timedelta(microseconds=1)
+    return f'{micros}.{pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = (int(part) for part in cursor.split('.'))
+        if not 0 <= pk <= MAX_PK:
+            raise ValueError(pk)
+        return EPOCH + timedelta(microseconds=micros), pk
+    except (ValueError, OverflowError):
+        raise Http404('Некорректный курсор страницы комментариев.')
+
+
+def older_than(cursor):
+    created, pk = decode_cursor(cursor)
+    return Q(created__lt=created) | Q(created=created, pk__lt=pk)
+
+
+def newer_than(cursor):
+    created, pk = decode_cursor(cursor)
+    return Q(created__gt=created) | Q(created=created, pk__gt=pk)
+
+
+def paginate_comments(queryset, before=None, after=None, per_page=None):
+    """
+    Возвращает страницу комментариев в хронологическом порядке.
+
+    Без курсора отдаётся страница самых свежих комментариев,
+    `before` листает к более ранним, `after` — к более поздним.
+    """
+    per_page = per_page or settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    if after:
+        comments = list(
+            queryset.filter(newer_than(after))
+            .order_by('created', 'id')[:per_page + 1]
+        )
+        has_newer = len(comments) > per_page
+        comments = comments[:per_page]
+        # Раньше первого комментария страницы могут быть только
+        # комментарии до курсора, и их может не оказаться вовсе.
+        has_older = bool(comments) and queryset.filter(older_than(
+            encode_cursor(comments[0].created, comments[0].pk)
+        )).exists()
+    else:
+        if before:
+            queryset = queryset.filter(older_than(before))
+        comments = list(queryset.order_by('-created', '-id')[:per_page + 1])
+        has_older = len(comments) > per_page
+        comments = comments[:per_page][::-1]
+        has_newer = bool(before)
+    return CommentPage(
+        object_list=comments,
+        older=encode_cursor(
+            comments[0].created, comments[0].pk
+        ) if comments and has_older else None,
+        newer=encode_cursor(
+            comments[-1].created, comments[-1].pk
+        ) if comments and has_newer else None,
+    )
+
+
+def comment_page_query(comment, per_page=None):
+    """
+    Строка запроса страницы, на которой находится комментарий.
+
+    Если комментарий попадает на страницу самых свежих — она открывается
+    по умолчанию и параметры не нужны. Иначе открываем страницу,
+    которая начинается с этого комментария.
+    """
+    per_page = per_page or settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    newer_count = Comment.objects.filter(
+        newer_than(encode_cursor(comment.created, comment.pk)),
+        news_id=comment.news_id,
+        status=Comment.Status.APPROVED,
+    )[:per_page].count()
+    if newer_count < per_page:
+        return ''
+    # Курсор «сразу перед комментарием»: строго больше (created, id - 1).
+    return f'?after={encode_cursor(comment.created, comment.pk - 1)}'
@@ -1,13 +1,124 @@
+from copy import deepcopy
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+import importlib
+import sys
 
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.test.client import Client
-from django.urls import reverse
+from django.urls import clear_url_caches, reverse
 import pytest
 
 from news.models import Comment, News
 
 
+# Общие данные сессии.
+#
+# Тест, помеченный @pytest.mark.usefixtures('shared_data'), получает
+# автора, не автора, новость, комментарий и клиентов из данных, которые
+# создаются один раз за сессию, а не заново для каждого теста. Данные
+# живут в транзакции, открытой на всю сессию, а транзакция каждого теста
+# вложена в неё и откатывается к точке сохранения, поэтому тесты
+# по-прежнему не видят изменений друг друга. Объекты копируются для
+# каждого теста, как атрибуты setUpTestData.
+#
+# Помечать можно только тесты, которые работают в транзакции: не
+# transaction=True и не асинхронные, ведь их соединения не видят
+# незафиксированных данных. Помеченные тесты выполняются после
+# остальных, чтобы общие данные не попадали в чужие тесты.
+
+
+def pytest_collection_modifyitems(items):
+    items.sort(key=lambda item: 'shared_data' in item.fixturenames)
+
+
+@pytest.fixture(scope='session')
+def shared_data(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        User = get_user_model()
+        author = User.objects.create(username='Автор')
+        not_author = User.objects.create(username='Не Автор')
+        news = News.objects.create(title='Заголовок новости', text='ТекстВ')
+        comment = Comment.objects.create(
+            news=news, author=author, text='Текст комментария'
+        )
+        # Сессии входа создаются один раз, клиенты получают только cookie.
+        sessions = {}
+        for user in (author, not_author):
+            client = Client()
+            client.force_login(user)
+            sessions[user.pk] = client.cookies[
+                settings.SESSION_COOKIE_NAME
+            ].value
+    yield SimpleNamespace(
+        author=author,
+        not_author=not_author,
+        news=news,
+        comment=comment,
+        sessions=sessions,
+    )
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
+@pytest.fixture
+# Копия общих данных для теста, который их использует, иначе None.
+def shared(request):
+    if 'shared_data' not in request.fixturenames:
+        return None
+    request.getfixturevalue('db')
+    return deepcopy(request.getfixturevalue('shared_data'))
+
+
+def logged_in_client(user, shared):
+    # Создаём новый экземпляр клиента, чтобы не менять глобальный.
+    client = Client()
+    if shared is not None:
+        client.cookies[settings.SESSION_COOKIE_NAME] = shared.sessions[
+            user.pk
+        ]
+    else:
+        client.force_login(user)
+    return client
+
+
+@pytest.fixture(autouse=True)
+# Очищаем кеш, чтобы тесты не видели карточки новостей друг друга.
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+# Подключаем асинхронные главную и страницу новости, как под ASGI.
+def async_views(settings):
+    def reload_urls():
+        for module in ('news.urls', settings.ROOT_URLCONF):
+            importlib.reload(sys.modules[module])
+        clear_url_caches()
+
+    enabled = settings.NEWS_ASYNC_VIEWS
+    settings.NEWS_ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.NEWS_ASYNC_VIEWS = enabled
+    reload_urls()
+
+
+@pytest.fixture
+# GET-запрос асинхронным клиентом из синхронного теста.
+def async_get(async_client):
+    async def get(*args, **kwargs):
+        return await async_client.get(*args, **kwargs)
+    return async_to_sync(get)
+
+
 @pytest.fixture
 def parametrized_client(author_client, anonymous_client):
     return {'author_client': author_client,
@@ -17,32 +128,32 @@ def parametrized_client(author_client, anonymous_client):
 @pytest.fixture
 # Используем встроенную фикстуру модели пользователей
 # для создания пользователя - Автор.
-def author(django_user_model):
+def author(django_user_model, shared):
+    if shared is not None:
+        return shared.author
     return django_user_model.objects.create(username='Автор')
 
 
 @pytest.fixture
 # Используем встроенную фикстуру модели пользователей
 # для создания пользователя - Не автор.
-def not_author(django_user_model):
+def not_author(django_user_model, shared):
+    if shared is not None:
+        return shared.not_author
     return django_user_model.objects.create(username='Не Автор')
 
 
 @pytest.fixture
 # Создаем клиента Автора.
-def author_client(author):  # Вызываем фикстуру автора.
-    # Создаём новый экземпляр клиента, чтобы не менять глобальный.
-    client = Client()
-    client.force_login(author)  # Логиним автора в клиенте.
-    return client
+def author_client(author, shared):  # Вызываем фикстуру автора.
+    return logged_in_client(author, shared)  # Логиним автора в клиенте.
 
 
 @pytest.fixture
 # Создаем клиента не Автора.
-def not_author_client(not_author):  # Вызываем фикстуру не автора.
-    client = Client()
-    client.force_login(not_author)  # Логиним обычного пользователя в клиенте.
-    return client
+def not_author_client(not_author, shared):  # Вызываем фикстуру не автора.
+    # Логиним обычного пользователя в клиенте.
+    return logged_in_client(not_author, shared)
 
 
 @pytest.fixture
@@ -55,7 +166,9 @@ def anonymous_client():
 
 @pytest.fixture
 # Создаём объект новости.
-def news():
+def news(shared):
+    if shared is not None:
+        return shared.news
     news = News.objects.create(
         title='Заголовок новости',
         text='ТекстВ',
@@ -65,7 +178,9 @@ def news():
 
 @pytest.fixture
 # Создаём объект комментарий.
-def comment(author, news):
+def comment(author, news, shared):
+    if shared is not None:
+        return shared.comment
     comment = Comment.objects.create(  # Создаём объект комментария.
         news=news,
         author=author,
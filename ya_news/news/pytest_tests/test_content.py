@@ -1,15 +1,30 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_init
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
 from django.conf import settings
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 from news.forms import CommentForm
+from news.models import Comment, News, make_excerpt
+from news.pagination import encode_cursor
+from ya_common.warmup import template_names, warm_up
 
 
 User = get_user_model()
 
 # Задаем адрес домашней страницы в качестве глобальной константы.
 HOME_URL = reverse('news:home')
+API_URL = reverse('news:api')
 
 
 @pytest.mark.django_db
@@ -42,6 +57,76 @@ def test_news_order(client,):
     assert all_dates == sorted_dates
 
 
+@pytest.mark.django_db
+def test_home_page_shows_comment_count(client, news, list_comment):
+    response = client.get(HOME_URL)
+    news_from_page, = response.context['object_list']
+    expected_count = settings.NEWS_COUNT_ON_HOME_PAGE + 1
+    assert news_from_page.comment_count == expected_count
+    assert f'Комментариев: {expected_count}' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_home_page_does_not_load_comments(client, list_news, list_comment):
+    """Главная страница считает комментарии в БД, не загружая их."""
+    loaded_comments = []
+
+    def on_comment_init(sender, instance, **kwargs):
+        loaded_comments.append(instance)
+
+    post_init.connect(on_comment_init, sender=Comment)
+    try:
+        client.get(HOME_URL)
+    finally:
+        post_init.disconnect(on_comment_init, sender=Comment)
+    assert loaded_comments == []
+
+
+@pytest.mark.django_db
+def test_home_page_cached_cards_cost_one_query(
+        client, django_assert_num_queries, list_news
+):
+    """Повторный запрос главной берёт карточки из кеша."""
+    first_content = client.get(HOME_URL).content
+    with django_assert_num_queries(1):
+        response = client.get(HOME_URL)
+    assert response.content == first_content
+
+
+@pytest.mark.django_db
+def test_cached_card_never_shows_stale_comment_count(
+        client, author, news, comment
+):
+    """Карточка обновляется при любом изменении комментариев."""
+    assert 'Комментариев: 1' in client.get(HOME_URL).content.decode()
+    Comment.objects.bulk_create([
+        Comment(news=news, author=author, text='Без сигналов'),
+    ])
+    assert 'Комментариев: 2' in client.get(HOME_URL).content.decode()
+    comment.delete()
+    assert 'Комментариев: 1' in client.get(HOME_URL).content.decode()
+    Comment.objects.filter(news=news).delete()
+    assert 'Комментариев' not in client.get(HOME_URL).content.decode()
+
+
+@pytest.mark.django_db
+def test_cached_card_follows_news_changes(client, news):
+    client.get(HOME_URL)
+    news.title = 'Новый заголовок'
+    news.save()
+    assert news.title in client.get(HOME_URL).content.decode()
+
+
+@pytest.mark.django_db
+def test_cached_card_follows_news_changed_elsewhere(client, news):
+    """Правку в другом процессе, без сигналов, карточка видит по modified."""
+    client.get(HOME_URL)
+    News.objects.filter(pk=news.pk).update(
+        title='Новый заголовок', modified=timezone.now()
+    )
+    assert 'Новый заголовок' in client.get(HOME_URL).content.decode()
+
+
 @pytest.mark.django_db
 def test_comments_order(author_client, news, detail_url):
     response = author_client.get(detail_url)
@@ -51,3 +136,304 @@ def test_comments_order(author_client, news, detail_url):
     all_timestamps = [comment.created for comment in all_comments]
     sorted_timestamps = sorted(all_timestamps)
     assert all_timestamps == sorted_timestamps
+
+
+@pytest.mark.django_db
+def test_detail_page_shows_latest_comments(
+        client, settings, news, list_comment, detail_url
+):
+    """Без курсора выводится страница самых свежих комментариев."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    response = client.get(detail_url)
+    page = response.context['comments']
+    latest = list(news.comment_set.order_by('-created', '-id')[:5])[::-1]
+    assert page.object_list == latest
+    assert page.older is not None
+    assert page.newer is None
+
+
+@pytest.mark.django_db
+def test_comment_pages_cover_whole_thread(
+        client, settings, news, list_comment, detail_url
+):
+    """Переходы по курсору «ранее» проходят все комментарии по порядку."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    seen_comments = []
+    page = client.get(detail_url).context['comments']
+    seen_comments[:0] = page.object_list
+    while page.older:
+        response = client.get(detail_url, {'before': page.older})
+        page = response.context['comments']
+        assert page.newer is not None
+        seen_comments[:0] = page.object_list
+    assert seen_comments == list(news.comment_set.order_by('created', 'id'))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('start, has_older', ((0, False), (3, True)))
+def test_after_cursor_page_knows_older_comments(
+        client, settings, news, list_comment, detail_url, start, has_older
+):
+    """Ссылка «ранее» со страницы по курсору after — только если есть куда."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    comments = list(news.comment_set.order_by('created', 'id'))
+    first = comments[start]
+    response = client.get(
+        detail_url, {'after': encode_cursor(first.created, first.pk - 1)}
+    )
+    page = response.context['comments']
+    assert page.object_list == comments[start:start + 5]
+    assert (page.older is not None) == has_older
+    assert page.newer is not None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('param', ('before', 'after'))
+@pytest.mark.parametrize(
+    'cursor',
+    ('курсор', '99999999999999999999.1', '0.99999999999999999999', '0.-1'),
+)
+def test_bad_comment_cursor_is_not_found(client, detail_url, param, cursor):
+    """Курсор вне допустимых значений — 404, а не ошибка сервера."""
+    response = client.get(detail_url, {param: cursor})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_home_page(async_views, async_get, list_news):
+    response = async_get(HOME_URL)
+    assert response.status_code == 200
+    assert len(response.context['news_cards']) == (
+        settings.NEWS_COUNT_ON_HOME_PAGE
+    )
+
+
+@pytest.mark.django_db
+def test_async_detail_page(async_views, async_get, list_comment, detail_url):
+    response = async_get(detail_url)
+    assert response.status_code == 200
+    assert len(response.context['comments'].object_list) == (
+        settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    )
+    assert 'form' not in response.context
+
+
+@pytest.mark.django_db
+def test_async_detail_page_not_found(async_views, async_get):
+    url = reverse('news:detail', args=(0,))
+    assert async_get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_pages_answer_not_modified(
+        async_views, async_get, list_news, detail_url
+):
+    for url in (HOME_URL, detail_url):
+        etag = async_get(url)['ETag']
+        # Асинхронный клиент Django 3.2 принимает заголовки как есть.
+        response = async_get(url, **{'If-None-Match': etag})
+        assert response.status_code == 304
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, pytest.lazy_fixture('detail_url')),
+)
+def test_unchanged_page_is_not_rendered_again(author_client, comment, url):
+    response = author_client.get(url)
+    assert response['Cache-Control'] == 'private, no-cache'
+    repeated = author_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert repeated.status_code == 304
+    assert repeated.templates == []
+    repeated = author_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert repeated.status_code == 304
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, pytest.lazy_fixture('detail_url')),
+)
+def test_page_etag_follows_comments(author_client, author, news, url):
+    etag = author_client.get(url)['ETag']
+    comment = Comment.objects.create(news=news, author=author, text='Текст')
+    assert author_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    etag = author_client.get(url)['ETag']
+    comment.text = 'Исправленный текст'
+    comment.save()
+    assert author_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_home_last_modified_follows_new_comment(client, author, news):
+    """Клиент только с If-Modified-Since видит новый комментарий."""
+    News.objects.filter(pk=news.pk).update(
+        modified=timezone.now() - timedelta(hours=1)
+    )
+    last_modified = client.get(HOME_URL)['Last-Modified']
+    Comment.objects.create(news=news, author=author, text='Текст')
+    response = client.get(HOME_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_last_modified_follows_deleted_comment(
+        client, author, news, detail_url
+):
+    """Удаление последнего комментария сдвигает его время назад,
+    но страница всё равно считается изменённой.
+    """
+    now = timezone.now()
+    older, latest = (
+        Comment.objects.create(news=news, author=author, text=text)
+        for text in ('Первый', 'Второй')
+    )
+    Comment.objects.filter(pk=older.pk).update(
+        created=now - timedelta(hours=2)
+    )
+    Comment.objects.filter(pk=latest.pk).update(
+        created=now - timedelta(hours=1)
+    )
+    News.objects.filter(pk=news.pk).update(
+        modified=now - timedelta(hours=2),
+        last_comment_at=now - timedelta(hours=1),
+    )
+    last_modified = client.get(detail_url)['Last-Modified']
+    latest.delete()
+    response = client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_etag_depends_on_viewer_and_page(
+        author_client, not_author_client, client, comment, detail_url
+):
+    etags = {
+        author_client.get(detail_url)['ETag'],
+        not_author_client.get(detail_url)['ETag'],
+        client.get(detail_url)['ETag'],
+        client.get(detail_url, {'before': '0.0'})['ETag'],
+    }
+    assert len(etags) == 4
+
+
+def test_warm_up_compiles_project_templates(settings):
+    """Прогрев компилирует все шаблоны templates/, если он включён."""
+    assert warm_up() == 0
+    settings.WARM_UP_ON_START = True
+    names = template_names(settings.TEMPLATES[0]['DIRS'][0])
+    assert {'base.html', 'includes/header.html', 'news/home.html'} <= set(
+        names
+    )
+    assert warm_up() == len(names)
+
+
+def get_feed(client, url):
+    response = client.get(url)
+    assert response.streaming
+    content = b''.join(response.streaming_content)
+    return response.status_code, json.loads(content)
+
+
+@pytest.mark.django_db
+def test_news_api_pages_by_cursor(client, list_news):
+    """Лента отдаёт все новости от новых к старым без повторов."""
+    # Новости одного дня упорядочены по id.
+    News.objects.bulk_create(
+        News(title=f'Тоже сегодня {index}', text='Текст')
+        for index in range(3)
+    )
+    expected = list(
+        News.objects.order_by('-date', '-id').values_list('id', flat=True)
+    )
+    ids = []
+    url = f'{API_URL}?limit=4'
+    while url:
+        status, page = get_feed(client, url)
+        assert status == 200
+        assert len(page['results']) <= 4
+        ids += [news['id'] for news in page['results']]
+        url = page['next']
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_news_api_loads_only_requested_fields(client, news):
+    with CaptureQueriesContext(connection) as context:
+        status, page = get_feed(client, f'{API_URL}?fields=title')
+    assert page['results'] == [{'id': news.pk, 'title': news.title}]
+    sql = ' '.join(query['sql'] for query in context.captured_queries)
+    assert '"text"' not in sql
+    status, page = get_feed(client, f'{API_URL}?fields=text,comment_count')
+    assert page['results'] == [
+        {'id': news.pk, 'text': news.text, 'comment_count': 0}
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'query',
+    (
+        'fields=title,password',
+        'before=вчера',
+        'before=2020-01-01.99999999999999999999',
+        'before=2020-01-01.-1',
+        'limit=много',
+    ),
+)
+def test_news_api_rejects_bad_parameters(client, query):
+    response = client.get(f'{API_URL}?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        '',
+        'Коротко.',
+        ' '.join(['слово'] * 15),
+        ' '.join(['слово'] * 16),
+        '  Пробелы\tи\nпереносы   ' * 10,
+        ' '.join(['слово'] * 14 + ['многоточие …', 'дальше']),
+    ),
+)
+def test_excerpt_matches_truncatewords(text):
+    assert make_excerpt(text) == Truncator(text).words(15, truncate=' …')
+
+
+@pytest.mark.parametrize('words', (0, 1, 3))
+def test_excerpt_respects_explicit_word_count(words):
+    text = ' '.join(['слово'] * 20)
+    assert make_excerpt(text, words) == (
+        Truncator(text).words(words, truncate=' …')
+    )
+
+
+@pytest.mark.django_db
+def test_home_page_does_not_load_news_text(client, news):
+    news.text = 'Очень длинный текст новости ' * 100
+    news.save(update_fields=['text'])
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(HOME_URL)
+    sql = ' '.join(query['sql'] for query in context.captured_queries)
+    assert '"text"' not in sql
+    assert make_excerpt(news.text) in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_backfill_news_excerpts_command(list_news):
+    backdated = timezone.now() - timedelta(days=1)
+    News.objects.update(excerpt='', modified=backdated)
+    output = StringIO()
+    call_command('backfill_news_excerpts', batch_size=3, stdout=output)
+    assert f'Заполнено отрывков: {News.objects.count()}.' in (
+        output.getvalue()
+    )
+    for news in News.objects.all():
+        assert news.excerpt == make_excerpt(news.text)
+        assert news.modified > backdated
@@ -1,10 +1,16 @@
 from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
 
 from pytest_django.asserts import assertFormError, assertRedirects
 import pytest
 
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.matcher import BadWordsMatcher
+from news.models import Comment, News
+from news.moderation import process_batch, stats
 
 import pytest
 
@@ -61,6 +67,13 @@ def test_user_cant_use_bad_words(
     assert final_comments_count == initial_comments_count
 
 
+def test_form_errors_page_shows_comments(author_client, comment, detail_url):
+    """При ошибке в форме комментарии новости остаются на странице."""
+    bad_words_data = {'text': f'Текст, {BAD_WORDS[0]}'}
+    response = author_client.post(detail_url, data=bad_words_data)
+    assert response.context['comments'].object_list == [comment]
+
+
 def test_author_can_delete_comment(
         author_client,
         comment,
@@ -123,3 +136,286 @@ def test_user_cant_edit_comment_of_another_user(
     assert comment.text == comment_from_db.text
     assert comment.news == comment_from_db.news
     assert comment.author == comment_from_db.author
+
+
+def test_edit_redirects_to_page_with_comment(
+        settings,
+        author_client,
+        comment,
+        list_comment,
+        comment_edit_url,
+        comment_form_data,
+        detail_url,
+):
+    """После редактирования старого комментария открывается
+    страница, на которой он находится.
+    """
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    response = author_client.post(comment_edit_url, data=comment_form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url.startswith(f'{detail_url}?after=')
+    assert response.url.endswith('#comments')
+    process_batch()
+    page = author_client.get(response.url).context['comments']
+    assert page.object_list[0] == comment
+
+
+@pytest.mark.parametrize(
+    'text, options, found',
+    (
+        ('ушел на ПЕРЕРЫВ', {}, 'перерыв'),
+        ('он негодяй!', {}, 'негодяй'),
+        ('негодяйство', {}, 'негодяй'),
+        ('негодяйство', {'whole_words': True}, None),
+        ('ну и негодяй.', {'whole_words': True}, 'негодяй'),
+        ('прорыв', {}, 'рыв'),
+        ('прорыв', {'whole_words': True}, None),
+        ('ЁЖИК', {}, 'ёжик'),
+        ('ЁЖИК', {'casefold': False}, None),
+        ('просто текст', {}, None),
+    ),
+)
+def test_bad_words_matcher(text, options, found):
+    """Проверяем поиск слов автоматом, в том числе перекрывающихся."""
+    matcher = BadWordsMatcher(('негодяй', 'рыв', 'перерыв', 'ёжик'), **options)
+    assert matcher.search(text) == found
+
+
+def test_bad_words_matcher_finds_suffix_words():
+    """Слово, являющееся суффиксом другого, тоже находится."""
+    matcher = BadWordsMatcher(('абвгд', 'вгде'))
+    assert matcher.search('бвгде') == 'вгде'
+
+
+def test_bad_words_file(settings, tmp_path, author_client, detail_url):
+    """Проверяем, что словарь дополняется словами из файла."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# модерация\nпустобрёх\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    initial_comments_count = Comment.objects.count()
+    response = author_client.post(
+        detail_url, data={'text': 'Вот ПУСТОБРЁХ какой'}
+    )
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    assert Comment.objects.count() == initial_comments_count
+
+
+@pytest.mark.django_db
+def test_user_can_create_comment_async(
+        async_views, author, author_client, detail_url, comment_form_data
+):
+    """Асинхронная страница новости принимает комментарии."""
+    Comment.objects.all().delete()
+    response = author_client.post(detail_url, data=comment_form_data)
+    assertRedirects(response, f'{detail_url}#comments')
+    assert Comment.objects.get().author == author
+
+
+@pytest.mark.django_db
+def test_comments_update_news_activity(
+        author_client, news, comment, detail_url, comment_form_data
+):
+    author_client.post(detail_url, data=comment_form_data)
+    new_comment = Comment.objects.latest('created')
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    process_batch()
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    assert news.last_comment_at == new_comment.created
+    author_client.delete(reverse('news:delete', args=(new_comment.pk,)))
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert news.last_comment_at == comment.created
+    author_client.delete(reverse('news:delete', args=(comment.pk,)))
+    news.refresh_from_db()
+    assert (news.comment_count, news.last_comment_at) == (0, None)
+
+
+@pytest.mark.django_db
+def test_posted_comment_waits_for_moderation(
+        author_client, news, detail_url, comment_form_data,
+        django_capture_on_commit_callbacks,
+):
+    """Комментарий появляется на странице только после модерации."""
+    with django_capture_on_commit_callbacks() as callbacks:
+        author_client.post(detail_url, data=comment_form_data)
+    assert len(callbacks) == 1
+    comment = Comment.objects.get()
+    assert comment.status == Comment.Status.PENDING
+    response = author_client.get(detail_url)
+    assert comment_form_data['text'] not in response.content.decode()
+    assert process_batch() == 1
+    comment.refresh_from_db()
+    assert comment.status == Comment.Status.APPROVED
+    response = author_client.get(detail_url)
+    assert comment_form_data['text'] in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_comment_is_not_saved_if_signal_fails(
+        monkeypatch, author_client, detail_url, comment_form_data
+):
+    """Комментарий и обработчики post_save — одна транзакция."""
+    def fail(news_id):
+        raise RuntimeError
+
+    monkeypatch.setattr('news.signals.invalidate_news_card', fail)
+    with pytest.raises(RuntimeError):
+        author_client.post(detail_url, data=comment_form_data)
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_moderation_rejects_comment(author_client, news, detail_url):
+    """Отклонённый комментарий не виден и не учитывается в новости."""
+    text = ' '.join(f'https://example.com/{number}' for number in range(4))
+    author_client.post(detail_url, data={'text': text})
+    process_batch()
+    assert Comment.objects.get().status == Comment.Status.REJECTED
+    news.refresh_from_db()
+    assert (news.comment_count, news.last_comment_at) == (0, None)
+    assert text not in author_client.get(detail_url).content.decode()
+
+
+def test_edited_comment_is_moderated_again(
+        author_client, news, comment, comment_edit_url, comment_form_data
+):
+    author_client.post(comment_edit_url, data=comment_form_data)
+    comment.refresh_from_db()
+    news.refresh_from_db()
+    assert comment.status == Comment.Status.PENDING
+    assert news.comment_count == 0
+    process_batch()
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+@pytest.mark.django_db
+def test_moderate_comments_command(settings, author, news):
+    settings.COMMENT_MODERATION_MODE = 'command'
+    stats.reset()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {number}',
+                status=Comment.Status.PENDING)
+        for number in range(5)
+    )
+    output = StringIO()
+    call_command('moderate_comments', once=True, batch_size=2, stdout=output)
+    assert not Comment.objects.filter(status=Comment.Status.PENDING).exists()
+    assert 'Одобрено: 5' in output.getvalue()
+    assert 'пачек: 3' in output.getvalue()
+    assert 'в очереди: 0' in output.getvalue()
+    news.refresh_from_db()
+    assert news.comment_count == 5
+
+
+@pytest.mark.django_db
+def test_bulk_created_comments_update_news_activity(author, news):
+    """bulk_create комментариев сам обновляет счётчики новости."""
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text='Текст') for _ in range(3)
+    )
+    news.refresh_from_db()
+    latest = Comment.objects.latest('created')
+    assert (news.comment_count, news.last_comment_at) == (3, latest.created)
+
+
+@pytest.mark.django_db
+def test_recompute_news_activity_command(author, list_news):
+    news_list = list(News.objects.order_by('pk'))
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text='Текст')
+        for news in news_list[:2] for _ in range(3)
+    )
+    # Счётчики, испорченные в обход ORM.
+    News.objects.update(comment_count=7, last_comment_at=None)
+    output = StringIO()
+    call_command('recompute_news_activity', batch_size=3, stdout=output)
+    assert str(len(news_list)) in output.getvalue()
+    activity = list(
+        News.objects.order_by('pk').values_list(
+            'comment_count', 'last_comment_at'
+        )
+    )
+    latest = Comment.objects.filter(news=news_list[0]).latest('created')
+    assert activity[0] == (3, latest.created)
+    assert activity[2:] == [(0, None)] * (len(news_list) - 2)
+
+
+@pytest.mark.django_db
+def test_seed_command():
+    """Генератор создаёт данные детерминированно и считает активность."""
+    def seed():
+        call_command('seed', users=3, news=5, comments=40, seed=1,
+                     batch_size=7, stdout=StringIO())
+        return list(Comment.objects.order_by('id').values_list(
+            'news__title', 'author__username', 'text'
+        ))
+
+    first = seed()
+    assert len(first) == 40
+    assert list(News.objects.values_list('comment_count', flat=True)) == [
+        news.comment_set.count() for news in News.objects.all()
+    ]
+    News.objects.all().delete()
+    assert seed() == first
+
+
+@pytest.mark.django_db
+def test_seed_leaves_existing_news_alone(news, comment):
+    """Комментарии достаются только новым новостям, пересчёт — тоже."""
+    News.objects.filter(pk=news.pk).update(comment_count=7)
+    call_command('seed', users=3, news=5, comments=40, batch_size=7,
+                 stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 7
+    assert list(news.comment_set.all()) == [comment]
+    assert sum(
+        News.objects.exclude(pk=news.pk)
+        .values_list('comment_count', flat=True)
+    ) == 40
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('shared_data')
+@pytest.mark.parametrize('run', range(2))
+def test_shared_data_is_isolated(
+        run, author_client, comment_delete_url, comment
+):
+    """Изменения общих данных сессии откатываются после каждого теста."""
+    assert Comment.objects.filter(pk=comment.pk).exists()
+    response = author_client.post(comment_delete_url)
+    assert response.status_code == HTTPStatus.FOUND
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+
+
+@pytest.mark.django_db
+def test_admin_status_change_updates_news_activity(admin_client, author, news):
+    """Одобрение и отклонение в админке меняют счётчики новости."""
+    comment = Comment.objects.create(
+        news=news, author=author, text='Текст',
+        status=Comment.Status.PENDING,
+    )
+    url = reverse('admin:news_comment_change', args=(comment.pk,))
+    data = {'news': news.pk, 'author': author.pk, 'text': comment.text}
+    for status, count in (
+        (Comment.Status.APPROVED, 1),
+        (Comment.Status.REJECTED, 0),
+    ):
+        response = admin_client.post(url, {**data, 'status': status})
+        assert response.status_code == HTTPStatus.FOUND
+        news.refresh_from_db()
+        assert news.comment_count == count
+    assert news.last_comment_at is None
+
+
+@pytest.mark.django_db
+def test_moving_comment_updates_both_news(author, news, comment):
+    other = News.objects.create(title='Другая', text='Текст')
+    comment = Comment.objects.get(pk=comment.pk)
+    comment.news = other
+    comment.save()
+    news.refresh_from_db()
+    other.refresh_from_db()
+    assert (news.comment_count, other.comment_count) == (0, 1)
@@ -0,0 +1,201 @@
+import logging
+
+from django.core.cache import caches
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from news.models import Comment, News
+from news.moderation import process_batch
+from ya_common.auth import cached_users
+from ya_common.middleware import QueryBudgetExceeded, install_query_counters
+from ya_common.replicas import (
+    PIN_COOKIE, ReplicaRouter, Routing, current_routing,
+)
+from ya_common.sqlite import apply_sqlite_pragmas, full_scans
+
+HOME_URL = reverse('news:home')
+
+sqlite_only = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса в формате SQLite.'
+)
+
+
+@sqlite_only
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (
+        HOME_URL,
+        pytest.lazy_fixture('detail_url'),
+        pytest.lazy_fixture('comment_edit_url'),
+        pytest.lazy_fixture('comment_delete_url'),
+    ),
+)
+def test_views_use_indexes(author_client, list_news, list_comment, url):
+    """Запросы страниц читают таблицы только по индексам."""
+    with CaptureQueriesContext(connection) as context:
+        author_client.get(url)
+    assert context.captured_queries
+    assert full_scans(context.captured_queries) == []
+
+
+@sqlite_only
+@pytest.mark.django_db
+def test_older_comments_page_uses_index(
+        author_client, settings, list_comment, detail_url
+):
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    older = author_client.get(detail_url).context['comments'].older
+    with CaptureQueriesContext(connection) as context:
+        author_client.get(detail_url, {'before': older})
+    assert full_scans(context.captured_queries) == []
+
+
+@pytest.mark.django_db
+def test_query_budget_exceeded_raises(client, settings):
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    settings.QUERY_BUDGET_RAISE = True
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(HOME_URL)
+
+
+@pytest.mark.django_db
+def test_query_budget_exceeded_is_logged(client, settings, caplog):
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    settings.QUERY_BUDGET_RAISE = False
+    with caplog.at_level(logging.WARNING, logger='ya_common.middleware'):
+        response = client.get(HOME_URL)
+    assert response.status_code == 200
+    assert 'news:home' in caplog.text
+
+
+@pytest.mark.django_db
+def test_query_budget_counts_session_and_user(author_client, settings):
+    """В бюджет входят и запросы сессии и пользователя."""
+    # Кеши процесса пусты: сессия и пользователь читаются из БД.
+    caches['sessions'].clear()
+    cached_users.clear()
+    settings.QUERY_BUDGETS = {'news:home': 2}
+    with pytest.raises(QueryBudgetExceeded, match='3 queries'):
+        author_client.get(HOME_URL)
+
+
+@pytest.mark.django_db
+def test_session_and_user_come_from_process_cache(author_client, author):
+    """Повторный запрос не читает из БД ни сессию, ни пользователя."""
+    author_client.get(HOME_URL)
+    with CaptureQueriesContext(connection) as context:
+        author_client.get(HOME_URL)
+    assert context.captured_queries
+    tables = ' '.join(query['sql'] for query in context.captured_queries)
+    assert 'django_session' not in tables
+    assert 'auth_user' not in tables
+    # Сохранение пользователя сбрасывает его запись в кеше.
+    author.save()
+    with CaptureQueriesContext(connection) as context:
+        response = author_client.get(HOME_URL)
+    assert response.context['user'] == author
+    assert any(
+        'auth_user' in query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_query_budget_counts_async_views(async_views, async_get, settings):
+    """Запросы асинхронных представлений идут в потоках и тоже считаются."""
+    # Соединение теста открыто до запроса, подключаем к нему счётчик.
+    install_query_counters()
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    with pytest.raises(QueryBudgetExceeded, match='1 queries'):
+        async_get(HOME_URL)
+
+
+@pytest.mark.django_db
+def test_home_page_reads_activity_from_news(client, list_news, list_comment):
+    """Счётчики комментариев читаются из новости, а не из комментариев."""
+    with CaptureQueriesContext(connection) as context:
+        client.get(HOME_URL)
+    assert not any(
+        'news_comment' in query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_news_pages_read_from_replica(client, settings, news):
+    settings.DATABASE_REPLICAS = ['replica']
+    replica_news = News.objects.using('replica').create(
+        pk=news.pk + 1, title='Только на реплике', text='Текст'
+    )
+    assert replica_news.title in client.get(HOME_URL).content.decode()
+    replica_url = reverse('news:detail', args=(replica_news.pk,))
+    assert client.get(replica_url).status_code == 200
+    default_url = reverse('news:detail', args=(news.pk,))
+    assert client.get(default_url).status_code == 404
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_reads_after_write_use_primary(
+        author_client, settings, comment_form_data, detail_url
+):
+    """После комментария страница читается из default, а не с реплики."""
+    settings.DATABASE_REPLICAS = ['replica']
+    response = author_client.post(detail_url, data=comment_form_data)
+    assert PIN_COOKIE in response.cookies
+    process_batch()
+    response = author_client.get(detail_url)
+    assert comment_form_data['text'] in response.content.decode()
+
+
+def test_router_reads_primary_after_write_in_same_request():
+    router = ReplicaRouter()
+    routing = Routing()
+    routing.replica = 'replica'
+    token = current_routing.set(routing)
+    try:
+        assert router.db_for_read(News) == 'replica'
+        assert router.db_for_write(News) == 'default'
+        assert router.db_for_read(News) is None
+    finally:
+        current_routing.reset(token)
+    assert router.db_for_read(News) is None
+
+
+@sqlite_only
+@pytest.mark.django_db
+def test_sqlite_pragmas_are_applied(settings):
+    settings.SQLITE_PRAGMAS = {'cache_size': -1234}
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA cache_size')
+        (initial,), = cursor.fetchall()
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        cursor.execute('PRAGMA cache_size')
+        assert cursor.fetchall() == [(-1234,)]
+        cursor.execute(f'PRAGMA cache_size = {initial}')
+
+
+@pytest.mark.django_db
+def test_news_admin_change_page_queries_stay_flat(
+        admin_client, author, news, settings
+):
+    """Число запросов страницы новости в админке не растёт с комментариями."""
+    settings.NEWS_ADMIN_INLINE_COMMENTS = 5
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    # Первый запрос кладёт сессию и пользователя в кеш процесса.
+    admin_client.get(url)
+    counts = []
+    for total in (5, 50):
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text='Текст')
+            for _ in range(total - Comment.objects.count())
+        )
+        # Лог запросов прошлого замера сбивает отсчёт CaptureQueriesContext.
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == 200
+        counts.append(len(context.captured_queries))
+    assert counts[0] == counts[1]
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == settings.NEWS_ADMIN_INLINE_COMMENTS
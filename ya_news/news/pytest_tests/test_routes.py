@@ -3,6 +3,9 @@ from http import HTTPStatus
 from django.urls import reverse
 import pytest
 
+# Страницы только читают данные: берём общие данные сессии из conftest.
+pytestmark = pytest.mark.usefixtures('shared_data')
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
@@ -12,6 +15,8 @@ import pytest
          reverse('news:home'), HTTPStatus.OK),
         (pytest.lazy_fixture('anonymous_client'),
          pytest.lazy_fixture('detail_url'), HTTPStatus.OK),
+        (pytest.lazy_fixture('anonymous_client'),
+         reverse('news:api'), HTTPStatus.OK),
         (pytest.lazy_fixture('anonymous_client'),
          reverse('users:login'), HTTPStatus.OK),
         (pytest.lazy_fixture('anonymous_client'),
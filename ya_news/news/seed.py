@@ -0,0 +1,95 @@
+"""Синтетические пользователи, новости и комментарии для замеров.
+
+Данные детерминированы: один и тот же seed даёт те же строки. Длины
+текстов распределены логнормально, даты новостей — за последний год,
+а комментарии распределены по новостям и авторам по закону Ципфа:
+немногие новости обсуждают много, большинство — почти никак.
+
+Строки создаются пачками через bulk_create, каждая пачка — в своей
+транзакции, а объекты строятся по ходу вставки, поэтому память не
+растёт с числом комментариев. Комментарии достаются только новым
+новостям, а их счётчики активности пересчитываются один раз, после
+всех пачек: пересчёт после каждой пачки замедлял генерацию быстрее,
+чем рос объём.
+"""
+import random
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from ya_common.seed import TextSource, batched, seed_users, zipf_weights
+
+from .activity import recompute_activity
+from .models import Comment, News
+
+WORDS = (
+    'новость', 'город', 'жители', 'мэр', 'дорога', 'мост', 'парк',
+    'школа', 'больница', 'погода', 'дождь', 'снег', 'жара', 'праздник',
+    'концерт', 'выставка', 'матч', 'команда', 'победа', 'счёт', 'цены',
+    'рынок', 'магазин', 'транспорт', 'автобус', 'метро', 'ремонт',
+    'строительство', 'район', 'улица', 'площадь', 'власти', 'решение',
+    'закон', 'проект', 'бюджет', 'суд', 'полиция', 'авария', 'пожар',
+    'спасатели', 'врачи', 'учёные', 'открытие', 'исследование', 'сегодня',
+    'вчера', 'завтра', 'утром', 'вечером', 'заявили', 'сообщили',
+    'объявили', 'начали', 'закончили', 'отменили', 'перенесли', 'открыли',
+    'согласен', 'отлично', 'наконец', 'давно', 'пора', 'странно', 'зачем',
+    'не', 'и', 'в', 'на', 'с', 'по', 'из', 'за', 'для', 'после', 'до',
+)
+# Медиана и разброс длины текста в символах.
+NEWS_TEXT_LENGTH = (1500, 0.8)
+COMMENT_TEXT_LENGTH = (120, 1.0)
+MAX_NEWS_TEXT_LENGTH = 50_000
+MAX_COMMENT_TEXT_LENGTH = 3000
+NEWS_DAYS = 365
+
+SeedResult = namedtuple('SeedResult', ('users', 'news', 'comments'))
+
+
+def seed_news(users=100, news=1000, comments=20_000, seed=0,
+              batch_size=None):
+    """Создаёт пользователей, новости и комментарии; возвращает их число."""
+    batch_size = batch_size or settings.NEWS_SEED_BATCH_SIZE
+    rnd = random.Random(seed)
+    texts = TextSource(rnd, WORDS)
+    author_ids = seed_users(users, seed, batch_size)
+    today = date.today()
+    last_pk = News.objects.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+    stream = (
+        News(
+            title=texts.words(rnd.randint(2, 6)).capitalize()[:50],
+            text=texts.text(*NEWS_TEXT_LENGTH, MAX_NEWS_TEXT_LENGTH),
+            date=today - timedelta(days=rnd.randrange(NEWS_DAYS)),
+        )
+        for _ in range(news)
+    )
+    for batch in batched(stream, batch_size):
+        with transaction.atomic():
+            News.objects.bulk_create(batch)
+    # SQLite в Django 3.2 не возвращает id из bulk_create. Популярность
+    # новости не зависит от её даты, поэтому порядок перемешивается.
+    seeded = News.objects.filter(pk__gt=last_pk)
+    news_ids = list(seeded.order_by('pk').values_list('pk', flat=True))
+    rnd.shuffle(news_ids)
+    popularity = zipf_weights(len(news_ids))
+    activity = zipf_weights(len(author_ids))
+    for start in range(0, comments if news_ids else 0, batch_size):
+        size = min(batch_size, comments - start)
+        with transaction.atomic():
+            Comment.objects.bulk_create((
+                Comment(
+                    news_id=news_id,
+                    author_id=author_id,
+                    text=texts.text(
+                        *COMMENT_TEXT_LENGTH, MAX_COMMENT_TEXT_LENGTH
+                    ),
+                )
+                for news_id, author_id in zip(
+                    rnd.choices(news_ids, cum_weights=popularity, k=size),
+                    rnd.choices(author_ids, cum_weights=activity, k=size),
+                )
+            ), update_activity=False)
+    recompute_activity(queryset=seeded)
+    return SeedResult(len(author_ids), news, comments if news_ids else 0)
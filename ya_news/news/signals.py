@@ -0,0 +1,65 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .activity import comment_added, comment_deleted, refresh_activity
+from .cards import invalidate_news_card
+from .models import Comment, News, comments_bulk_created
+
+
+@receiver((post_save, post_delete), sender=News)
+def invalidate_card_on_news_change(sender, instance, **kwargs):
+    invalidate_news_card(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_card_on_comment_change(sender, instance, **kwargs):
+    invalidate_news_card(instance.news_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    """
+    Новый одобренный комментарий прибавляется к счётчикам новости.
+
+    Если у сохранённого комментария сменились статус или новость
+    (например, в админке), счётчики старой и новой новости
+    пересчитываются. Прежние значения запоминает Comment.from_db;
+    без них пересчёт выполняется на всякий случай.
+    """
+    loaded = getattr(instance, 'loaded_activity', None)
+    instance.loaded_activity = instance.activity_key()
+    if created:
+        # Комментарий с модерации учитывается, когда его одобрят.
+        if instance.status == Comment.Status.APPROVED:
+            comment_added(instance)
+        return
+    if loaded is None:
+        refresh_activity([instance.news_id])
+    elif loaded != instance.loaded_activity:
+        refresh_activity({loaded[0], instance.news_id})
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if instance.status == Comment.Status.APPROVED:
+        comment_deleted(instance)
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def count_bulk_created_comments(sender, news_ids, **kwargs):
+    refresh_activity(news_ids)
+    for news_id in news_ids:
+        invalidate_news_card(news_id)
+
+
+@receiver(post_save, sender=Comment)
+def touch_news_on_comment_edit(sender, instance, created, **kwargs):
+    """
+    Правка комментария не меняет ни их количество, ни время последнего,
+    поэтому о ней страницам новости сообщает News.modified.
+    """
+    if not created:
+        News.objects.filter(pk=instance.news_id).update(
+            modified=timezone.now()
+        )
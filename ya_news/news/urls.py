@@ -1,16 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import api, views
 
 app_name = 'news'
 
+# Под ASGI главная и страница новости могут работать асинхронно.
+if settings.NEWS_ASYNC_VIEWS:
+    news_list = views.AsyncNewsList.as_view()
+    news_detail = views.AsyncNewsDetailView.as_view()
+else:
+    news_list = views.NewsList.as_view()
+    news_detail = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', news_list, name='home'),
+    path('news/<int:pk>/', news_detail, name='detail'),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('api/news/', api.NewsFeed.as_view(), name='api'),
 ]
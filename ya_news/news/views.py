@@ -1,11 +1,21 @@
+from inspect import isawaitable
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views import generic
 
+from .cards import render_news_cards
+from .conditional import (
+    aconditional_response, conditional_response, page_etag,
+)
 from .forms import CommentForm
 from .models import Comment, News
+from .moderation import schedule_moderation
+from .pagination import comment_page_query, paginate_comments
 
 
 class NewsList(generic.ListView):
@@ -13,26 +23,74 @@ class NewsList(generic.ListView):
     model = News
     template_name = 'news/home.html'
 
+    def get(self, request, *args, **kwargs):
+        """Если новости и их комментарии не менялись, отвечаем 304."""
+        self.object_list = self.get_queryset()
+        news_list = list(self.object_list)
+        etag = page_etag(request, *(
+            (news.pk, news.modified, news.comment_count)
+            for news in news_list
+        ))
+        return conditional_response(
+            request, etag,
+            max((news.modified for news in news_list), default=None),
+            lambda: self.render_to_response(self.get_context_data()),
+        )
+
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Загружаются только ключи, время изменения и количество
+        комментариев, остальное берётся из кеша карточек.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
+        return self.model.objects.only(
+            'id', 'date', 'modified', 'comment_count'
         )[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['news_cards'] = render_news_cards(context['object_list'])
+        return context
+
+
+class CommentsPageMixin:
+    """Добавляет в контекст страницу комментариев к новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = paginate_comments(
+            self.object.comment_set.filter(
+                status=Comment.Status.APPROVED
+            ).select_related('author'),
+            before=self.request.GET.get('before'),
+            after=self.request.GET.get('after'),
+        )
+        return context
 
-class NewsDetail(generic.DetailView):
+
+class NewsDetail(CommentsPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    def get(self, request, *args, **kwargs):
+        """Если новость и её комментарии не менялись, отвечаем 304."""
+        self.object = news = self.get_object()
+        etag = page_etag(
+            request, news.pk, news.modified,
+            news.comment_count, news.last_comment_at,
+        )
+        return conditional_response(
+            request, etag,
+            max(filter(None, (news.modified, news.last_comment_at))),
+            lambda: self.render_to_response(
+                self.get_context_data(object=news)
+            ),
         )
+
+    def get_object(self, queryset=None):
+        obj = get_object_or_404(self.model, pk=self.kwargs['pk'])
         return obj
 
     def get_context_data(self, **kwargs):
@@ -44,6 +102,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -59,12 +118,19 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        # Комментарий появится на странице после модерации.
+        comment.status = Comment.Status.PENDING
+        # Сигналы post_save обновляют счётчики новости в этой же транзакции.
+        with transaction.atomic():
+            comment.save()
+            schedule_moderation()
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        """Новый комментарий всегда на странице самых свежих."""
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
@@ -78,15 +144,106 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+def load_user(request):
+    """Загружает ленивого request.user: сессия и пользователь — из БД."""
+    return request.user.is_authenticated
+
+
+def render_sync_view(view, request, *args, **kwargs):
+    """Вызывает синхронное представление и сразу отрисовывает ответ."""
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+class AsyncView(generic.View):
+    """
+    Представление с асинхронными обработчиками методов.
+
+    generic.View в Django 3.2 их не поддерживает: Django должен видеть,
+    что функция из as_view() — корутина, а ответы на OPTIONS и
+    неразрешённые методы остаются синхронными.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return markcoroutinefunction(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if isawaitable(response):
+            response = await response
+        return response
+
+    def render_page(self):
+        """Контекст и HTML страницы: и то и другое может читать БД."""
+        return self.render_to_response(self.get_context_data()).render()
+
+
+class AsyncNewsList(AsyncView, NewsList):
+    """
+    Список новостей для ASGI.
+
+    В Django 3.2 нет асинхронного ORM, поэтому запросы к БД выполняются
+    через sync_to_async, а ответ 304 отдаётся без перехода в поток.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        news_list = await sync_to_async(list)(self.object_list)
+        await sync_to_async(load_user)(request)
+        etag = page_etag(request, *(
+            (news.pk, news.modified, news.comment_count)
+            for news in news_list
+        ))
+        return await aconditional_response(
+            request, etag,
+            max((news.modified for news in news_list), default=None),
+            sync_to_async(self.render_page),
+        )
+
+
+class AsyncNewsDetail(AsyncView, NewsDetail):
+    """Страница новости для ASGI, запросы к БД — как в AsyncNewsList."""
+
+    async def get(self, request, *args, **kwargs):
+        self.object = news = await sync_to_async(self.get_object)()
+        await sync_to_async(load_user)(request)
+        etag = page_etag(
+            request, news.pk, news.modified,
+            news.comment_count, news.last_comment_at,
+        )
+        return await aconditional_response(
+            request, etag,
+            max(filter(None, (news.modified, news.last_comment_at))),
+            sync_to_async(self.render_page),
+        )
+
+
+class AsyncNewsDetailView(AsyncView):
+    """Страница новости и добавление комментария для ASGI."""
+
+    async def get(self, request, *args, **kwargs):
+        return await AsyncNewsDetail.as_view()(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        # Запись комментария и отрисовка формы с ошибками — в потоке.
+        return await sync_to_async(render_sync_view)(
+            NewsComment.as_view(), request, *args, **kwargs
+        )
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Возвращаемся на страницу комментариев, где он находится."""
+        comment = self.object
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
-        ) + '#comments'
+            'news:detail', kwargs={'pk': comment.news_id}
+        ) + comment_page_query(comment) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
@@ -98,6 +255,19 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        """
+        Изменённый комментарий снова проходит модерацию.
+
+        Пока он на модерации, новость его не учитывает: счётчики
+        пересчитывает сигнал post_save при смене статуса.
+        """
+        form.instance.status = Comment.Status.PENDING
+        with transaction.atomic():
+            response = super().form_valid(form)
+            schedule_moderation()
+        return response
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from ya_common.warmup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+os.environ.setdefault('NEWS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+warm_up()
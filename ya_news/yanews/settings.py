@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ya_common.middleware.QueryBudgetMiddleware',
+    'ya_common.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,6 +51,9 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать шаблоны при запуске воркера, см. ya_common/warmup.py.
+WARM_UP_ON_START = False
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -58,6 +64,39 @@ DATABASES = {
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite, см. settings_production.
+SQLITE_PRAGMAS = {}
+
+DATABASE_ROUTERS = ['ya_common.replicas.ReplicaRouter']
+# Псевдонимы реплик из DATABASES, с которых читают страницы REPLICA_VIEWS.
+# Пустой список — всё читается из default.
+DATABASE_REPLICAS = []
+REPLICA_VIEWS = ('news:home', 'news:detail', 'news:api')
+# Сколько секунд после запроса с записью браузер читает только из default.
+REPLICA_PIN_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Сессии в памяти процесса поверх таблицы сессий,
+    # см. ya_common/sessions.py.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+SESSION_ENGINE = 'ya_common.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+# Сколько секунд процесс доверяет сессии из своего кеша.
+SESSION_CACHE_TTL = 60
+
+# Пользователь запроса из кеша процесса, см. ya_common/auth.py.
+AUTHENTICATION_BACKENDS = ['ya_common.auth.CachedModelBackend']
+USER_CACHE_TTL = 60
+USER_CACHE_SIZE = 1000
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +119,58 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+NEWS_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Сколько слов текста показывает карточка новости на главной.
+NEWS_EXCERPT_WORDS = 15
+# Сколько новостей читать за раз в backfill_news_excerpts.
+NEWS_EXCERPT_BATCH_SIZE = 100
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 10
+
+# Новостей на странице JSON-ленты: по умолчанию и наибольшее для limit.
+NEWS_API_PAGE_SIZE = 20
+NEWS_API_MAX_PAGE_SIZE = 100
+
+# Сколько последних комментариев показывать в админке новости.
+NEWS_ADMIN_INLINE_COMMENTS = 20
+
+# Сколько новостей пересчитывать за один UPDATE в recompute_news_activity.
+NEWS_ACTIVITY_BATCH_SIZE = 1000
+
+# Размер пачки bulk_create в команде seed.
+NEWS_SEED_BATCH_SIZE = 10_000
+
+# Асинхронные главная и страница новости; yanews/asgi.py включает их.
+NEWS_ASYNC_VIEWS = os.environ.get('NEWS_ASYNC_VIEWS') == '1'
+
+# Файл с дополнительными запрещёнными словами: по слову в строке.
+BAD_WORDS_FILE = None
+BAD_WORDS_WHOLE_WORDS = False
+BAD_WORDS_CASEFOLD = True
+
+# Модерация комментариев с сайта, см. news/moderation.py.
+# 'threads' — пул потоков процесса после сохранения комментария,
+# 'command' — отдельный процесс manage.py moderate_comments.
+COMMENT_MODERATION_MODE = os.environ.get('COMMENT_MODERATION_MODE', 'threads')
+COMMENT_MODERATION_WORKERS = 2
+COMMENT_MODERATION_BATCH_SIZE = 100
+COMMENT_MODERATORS = (
+    'news.moderation.too_many_links',
+)
+# Больше ссылок в комментарии — отказ.
+COMMENT_MAX_LINKS = 3
+
+# Сколько SQL-запросов может выполнить страница, по имени маршрута.
+# Учитываются и запросы сессии и пользователя.
+QUERY_BUDGETS = {
+    'news:home': 4,
+    'news:api': 1,
+    # Новый, изменённый и удалённый комментарий обновляет и новость.
+    'news:detail': 5,
+    'news:edit': 6,
+    'news:delete': 6,
+}
+# При превышении бюджета не только писать в лог, но и падать с ошибкой.
+QUERY_BUDGET_RAISE = DEBUG
@@ -0,0 +1,16 @@
+"""
+Профиль тестов: те же настройки и БД-реплика для тестов чтения с реплик.
+
+pytest.ini и run_tests подключают его вместо settings.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES
+
+# Отдельная БД-реплика: тесты видят, откуда читает страница.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'db_replica.sqlite3',
+}
+
+# В тестах превышение бюджета запросов — ошибка.
+QUERY_BUDGET_RAISE = True
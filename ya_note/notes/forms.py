@@ -1,7 +1,4 @@
-from pytils.translit import slugify
-
 from django import forms
-from django.core.exceptions import ValidationError
 
 from .models import Note
 
@@ -15,15 +12,28 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def validate_unique(self):
+        """
+        Занятый slug находит уникальный индекс при сохранении.
+
+        Отдельный запрос на проверку не нужен: NoteFormBase ловит
+        IntegrityError и показывает ту же ошибку в поле slug. Пустой
+        slug подберёт модель при сохранении.
+        """
+
+
+class SearchForm(forms.Form):
+    """Форма поиска по заметкам."""
+
+    q = forms.CharField(label='Найти', max_length=100, required=False)
+
+
+class ImportForm(forms.Form):
+    """Форма загрузки заметок в формате JSON Lines."""
+
+    file = forms.FileField(
+        label='Файл JSON Lines',
+        help_text=(
+            'По заметке в строке: {"title": ..., "text": ..., "slug": ...}'
+        ),
+    )
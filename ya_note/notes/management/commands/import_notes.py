@@ -0,0 +1,42 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.jsonl import NotesImportError, import_notes
+
+
+class Command(BaseCommand):
+    help = 'Загружает заметки пользователя из файла JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            'path', help='Файл JSON Lines; `-` — читать из stdin.'
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        try:
+            if options['path'] == '-':
+                result = import_notes(
+                    author, sys.stdin, batch_size=options['batch_size']
+                )
+            else:
+                with open(options['path'], encoding='utf-8') as lines:
+                    result = import_notes(
+                        author, lines, batch_size=options['batch_size']
+                    )
+        except NotesImportError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            f'Загружено заметок: {result.created}, '
+            f'пропущено: {result.skipped}.'
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from notes.seed import seed_notes
+
+
+class Command(BaseCommand):
+    help = 'Создаёт синтетических пользователей и заметки для замеров.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--notes', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = seed_notes(
+            users=options['users'],
+            notes=options['notes'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f'Пользователей: {result.users}, заметок: {result.notes}.'
+        )
@@ -1,7 +1,10 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import allocate_slug, slug_base
+
+# Сколько раз подбирать slug заново, если его занял параллельный запрос.
+SLUG_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -23,16 +26,35 @@ class Note(models.Model):
         help_text=('Укажите адрес для страницы заметки. Используйте только '
                    'латиницу, цифры, дефисы и знаки подчёркивания')
     )
+    # Отдельный индекс по автору покрывает составной индекс из Meta.
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            # Заметки автора по порядку id: список с курсорной пагинацией.
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """Без slug подбирает свободный: из заголовка, с суффиксом -2, -3…"""
+        if self.slug:
+            return super().save(*args, **kwargs)
+        base = slug_base(
+            self.title, self._meta.get_field('slug').max_length
+        )
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            self.slug = allocate_slug(Note, base, exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS:
+                    raise
@@ -0,0 +1,54 @@
+"""Полнотекстовый поиск по заметкам автора.
+
+В SQLite используется индекс FTS5 notes_note_fts (см. миграцию
+0003_note_fts), результаты упорядочены по bm25. На других СУБД
+поиск выполняется через icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import Note
+
+# Вес заголовка, текста и автора в bm25: совпадение в заголовке важнее.
+BM25_WEIGHTS = (10.0, 1.0, 0.0)
+
+SEARCH_SQL = (
+    'SELECT note.id, note.slug, note.title '
+    'FROM notes_note_fts '
+    'JOIN notes_note AS note ON note.id = notes_note_fts.rowid '
+    'WHERE notes_note_fts MATCH %s AND note.author_id = %s '
+    'ORDER BY bm25(notes_note_fts, {weights}) '
+    'LIMIT %s'
+).format(weights=', '.join(map(str, BM25_WEIGHTS)))
+
+
+def fts_query(text, author_id):
+    """
+    Запрос FTS5 из пользовательского ввода.
+
+    Каждое слово ищется по префиксу, все слова обязательны.
+    Слова берутся в кавычки, поэтому синтаксис FTS5 из ввода не работает.
+    Условие на автора сужает поиск внутри индекса.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = ' AND '.join(f'"{word}"*' for word in words)
+    return f'author_id : "{author_id}" AND ({terms})'
+
+
+def search_notes(author, text, limit=None):
+    """Заметки автора, подходящие под запрос, самые релевантные первыми."""
+    limit = limit or settings.NOTES_SEARCH_RESULTS
+    match = fts_query(text, author.pk)
+    if match is None:
+        return Note.objects.none()
+    if connection.vendor != 'sqlite':
+        return Note.objects.filter(
+            Q(title__icontains=text) | Q(text__icontains=text),
+            author=author,
+        ).only('id', 'slug', 'title')[:limit]
+    return Note.objects.raw(SEARCH_SQL, [match, author.pk, limit])
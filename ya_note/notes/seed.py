@@ -0,0 +1,177 @@
+"""Синтетические пользователи и заметки для нагрузочных замеров.
+
+Данные детерминированы: один и тот же seed даёт те же строки. Длины
+текстов распределены логнормально, часть заголовков повторяется
+(«Список покупок», «Идеи»…), а заметки распределены по авторам
+неравномерно, как у настоящих пользователей.
+
+Строки создаются пачками через bulk_create, каждая пачка — в своей
+транзакции, а объекты строятся по ходу вставки, поэтому память не
+растёт с объёмом. Slug подбираются так же, как в Note.save: из
+заголовка, с суффиксом -2, -3… при совпадении, но без save() на
+каждую заметку.
+"""
+import random
+from collections import defaultdict, namedtuple
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+
+from ya_common.seed import TextSource, batched, seed_users, zipf_weights
+
+from .models import Note
+from .slugs import (
+    SUFFIX_RESERVE, allocate_slug, numbered_slug, slug_base, slug_variants,
+)
+
+WORDS = (
+    'заметка', 'список', 'покупки', 'молоко', 'хлеб', 'встреча', 'звонок',
+    'проект', 'отчёт', 'задача', 'идея', 'книга', 'фильм', 'рецепт',
+    'поездка', 'билеты', 'отпуск', 'работа', 'дом', 'ремонт', 'врач',
+    'понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота',
+    'неделя', 'месяц', 'план', 'цель', 'бюджет', 'счёт', 'оплата',
+    'подарок', 'день', 'рождения', 'друзья', 'семья', 'код', 'ошибка',
+    'релиз', 'тест', 'сервер', 'база', 'данных', 'запрос', 'страница',
+    'купить', 'сделать', 'позвонить', 'написать', 'проверить', 'забрать',
+    'отправить', 'прочитать', 'посмотреть', 'обсудить', 'записать', 'не',
+    'и', 'в', 'на', 'с', 'до', 'после', 'для', 'по', 'утром', 'вечером',
+)
+# Заголовки, которые пользователи пишут чаще всего.
+COMMON_TITLES = (
+    'Список покупок', 'Идеи', 'План на неделю', 'Дела', 'Рецепт',
+    'Книги', 'Фильмы', 'Подарки', 'Пароли от Wi-Fi', 'Без названия',
+)
+COMMON_TITLE_SHARE = 0.2
+# Медиана и разброс длины текста заметки в символах.
+TEXT_LENGTH = (300, 1.0)
+MAX_TEXT_LENGTH = 20_000
+# Сколько заголовков в одном запросе занятых вариантов slug: у каждого
+# четыре параметра, а SQLite старых версий принимает не больше 999.
+VARIANTS_PER_QUERY = 200
+
+SeedResult = namedtuple('SeedResult', ('users', 'notes'))
+
+
+class SlugAllocator:
+    """
+    Slug для потока новых заметок, как если бы каждая сохранялась save().
+
+    Помнит номера только для совпавших заголовков, поэтому память растёт
+    с числом повторяющихся заголовков, а не заметок.
+    """
+
+    def __init__(self):
+        self.max_length = Note._meta.get_field('slug').max_length
+        # Заголовок -> последний выданный номер.
+        self.numbers = {}
+        # Заголовок -> номера вариантов, занятых в БД до генерации.
+        self.existing = {}
+
+    def remember(self, base, number):
+        self.numbers[base] = max(self.numbers.get(base, 1), number)
+
+    @staticmethod
+    def number(base, slug):
+        """Номер slug, подобранного allocate_slug для base; у base — 1."""
+        suffix = slug.rpartition('-')[2]
+        return int(suffix) if slug != base and suffix.isdigit() else 1
+
+    def next_number(self, base):
+        """Следующий номер base, пропуская занятые в БД."""
+        number = self.numbers.get(base, 1) + 1
+        existing = self.existing.get(base, ())
+        while number in existing:
+            number += 1
+        self.numbers[base] = number
+        return number
+
+    def load_existing(self, bases):
+        """Читает занятые в БД варианты bases — запрос на пачку заголовков."""
+        stems = defaultdict(list)
+        for base in bases:
+            stems[base[:self.max_length - SUFFIX_RESERVE]].append(base)
+            self.remember(base, 1)
+            self.existing[base] = set()
+        for chunk in batched(bases, VARIANTS_PER_QUERY):
+            variants = reduce(or_, (
+                slug_variants(base, self.max_length) for base in chunk
+            ))
+            for slug in Note.objects.filter(variants).values_list(
+                'slug', flat=True
+            ):
+                stem, _, suffix = slug.rpartition('-')
+                if not suffix.isdigit():
+                    continue
+                for base in stems.get(stem, ()):
+                    self.existing[base].add(int(suffix))
+
+    def assign(self, notes):
+        """
+        Заполняет slug пачки.
+
+        Обычно хватает трёх запросов: какие заголовки уже заняты, их
+        варианты (по запросу на VARIANTS_PER_QUERY заголовков) и проверка
+        выданных номеров. Отдельный запрос на заметку нужен, только если
+        номер занят slug другого заголовка.
+        """
+        bases = [slug_base(note.title, self.max_length) for note in notes]
+        # Заголовки, которые уже заняты заметками, созданными до генерации.
+        self.load_existing(list(Note.objects.filter(
+            slug__in=set(bases) - self.numbers.keys()
+        ).values_list('slug', flat=True)))
+        batch_slugs = set()
+        for note, base in zip(notes, bases):
+            if base in self.numbers or base in batch_slugs:
+                note.slug = numbered_slug(
+                    base, self.next_number(base), self.max_length
+                )
+            else:
+                note.slug = base
+            batch_slugs.add(note.slug)
+        # Номер может совпасть со slug заголовка вида «Идеи 2» в той же
+        # пачке или в БД, если сам заголовок «Идеи» в БД не занят.
+        unique_bases = set(bases)
+        taken = set(Note.objects.filter(
+            slug__in={
+                note.slug for note in notes if note.slug not in unique_bases
+            }
+        ).values_list('slug', flat=True))
+        seen = set()
+        for note, base in zip(notes, bases):
+            if note.slug in taken or note.slug in seen:
+                note.slug = allocate_slug(Note, base, reserved=batch_slugs)
+                batch_slugs.add(note.slug)
+                self.remember(base, self.number(base, note.slug))
+            seen.add(note.slug)
+
+
+def seed_notes(users=100, notes=10_000, seed=0, batch_size=None):
+    """Создаёт пользователей и заметки; возвращает их число."""
+    batch_size = batch_size or settings.NOTES_SEED_BATCH_SIZE
+    rnd = random.Random(seed)
+    texts = TextSource(rnd, WORDS)
+    author_ids = seed_users(users, seed, batch_size)
+    # Активность авторов убывает по закону Ципфа.
+    activity = zipf_weights(len(author_ids))
+
+    def title():
+        if rnd.random() < COMMON_TITLE_SHARE:
+            return rnd.choice(COMMON_TITLES)
+        return texts.words(rnd.randint(1, 5)).capitalize()[:100]
+
+    slugs = SlugAllocator()
+    stream = (
+        Note(
+            title=title(),
+            text=texts.text(*TEXT_LENGTH, MAX_TEXT_LENGTH),
+            author_id=rnd.choices(author_ids, cum_weights=activity)[0],
+        )
+        for _ in range(notes)
+    )
+    for batch in batched(stream, batch_size):
+        with transaction.atomic():
+            slugs.assign(batch)
+            Note.objects.bulk_create(batch)
+    return SeedResult(len(author_ids), notes)
@@ -0,0 +1,66 @@
+"""Подбор свободного slug для заметки: slug, slug-2, slug-3…
+
+Занятые варианты читаются одним запросом по диапазону индекса slug:
+только сам slug и варианты с числовым суффиксом.
+Между подбором и вставкой slug может занять параллельный запрос,
+поэтому Note.save повторяет попытку при IntegrityError.
+"""
+import re
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+# Сколько символов оставить под суффикс, если slug упирается в max_length.
+SUFFIX_RESERVE = 7
+# Заголовок может не дать ни одного символа для slug.
+DEFAULT_SLUG = 'note'
+
+
+def slug_base(title, max_length):
+    return slugify(title)[:max_length] or DEFAULT_SLUG
+
+
+def numbered_slug(base, number, max_length):
+    """Вариант base с суффиксом: base-2, base-3…"""
+    return f'{base[:max_length - SUFFIX_RESERVE]}-{number}'
+
+
+def slug_variants(base, max_length):
+    """Условие на slug base и его варианты base-2, base-3…"""
+    stem = base[:max_length - SUFFIX_RESERVE]
+    # Варианты `stem-<цифры>` лежат в индексе между 'stem-0' и 'stem-:',
+    # ':' идёт сразу за '9'. Регулярное выражение отсекает внутри этого
+    # диапазона slug вроде `stem-2-idei`.
+    return Q(slug=base) | Q(
+        slug__gte=f'{stem}-0', slug__lt=f'{stem}-:',
+        slug__regex=rf'^{re.escape(stem)}-[0-9]+$',
+    )
+
+
+def allocate_slug(model, base, exclude_pk=None, reserved=()):
+    """
+    Первый свободный вариант slug среди base, base-2, base-3…
+
+    reserved — slug, которые заняты, но ещё не сохранены в БД
+    (например, в той же пачке импорта).
+    """
+    max_length = model._meta.get_field('slug').max_length
+    base = base[:max_length]
+    stem = base[:max_length - SUFFIX_RESERVE]
+    taken = set(
+        model.objects.filter(
+            slug_variants(base, max_length)
+        ).exclude(pk=exclude_pk).values_list('slug', flat=True)
+    )
+    taken.update(reserved)
+    if base not in taken:
+        return base
+    prefix = f'{stem}-'
+    used = {
+        int(slug[len(prefix):]) for slug in taken
+        if slug.startswith(prefix) and slug[len(prefix):].isdigit()
+    }
+    number = 2
+    while number in used:
+        number += 1
+    return numbered_slug(base, number, max_length)
@@ -1,9 +1,13 @@
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
 from notes.forms import NoteForm
 from notes.models import Note
+from ya_common.warmup import template_names, warm_up
 
 User = get_user_model()
 
@@ -72,3 +76,154 @@ class TestNoteContentAndForms(TestCase):
         url = reverse('notes:edit', args=[self.note_author.slug])
         response = self.auth_client_author.get(url)
         self.assertIsInstance(response.context['form'], NoteForm)
+
+
+@override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+class TestNotesListPagination(TestCase):
+    """Набор тестов для проверки постраничного вывода списка заметок."""
+
+    NOTES_COUNT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка данных для тестов."""
+        cls.author = User.objects.create(username='author')
+        cls.auth_client_author = Client()
+        cls.auth_client_author.force_login(cls.author)
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='Текст',
+                slug=f'note-{index}',
+                author=cls.author,
+            )
+            for index in range(cls.NOTES_COUNT)
+        )
+        cls.url = reverse('notes:list')
+
+    def test_pages_cover_all_notes_in_id_order(self):
+        """Переходы по курсору проходят все заметки автора по порядку."""
+        response = self.auth_client_author.get(self.url)
+        self.assertIsNone(response.context['previous_before'])
+        seen_notes = list(response.context['object_list'])
+        while response.context['next_after']:
+            response = self.auth_client_author.get(
+                self.url, {'after': response.context['next_after']}
+            )
+            self.assertLessEqual(len(response.context['object_list']), 2)
+            seen_notes += response.context['object_list']
+        self.assertEqual(
+            seen_notes,
+            list(Note.objects.filter(author=self.author).order_by('id')),
+        )
+
+    def test_previous_page(self):
+        """Курсор `before` возвращает на предыдущую страницу."""
+        first_page = self.auth_client_author.get(self.url)
+        second_page = self.auth_client_author.get(
+            self.url, {'after': first_page.context['next_after']}
+        )
+        response = self.auth_client_author.get(
+            self.url, {'before': second_page.context['previous_before']}
+        )
+        self.assertEqual(
+            response.context['object_list'],
+            first_page.context['object_list'],
+        )
+
+    def test_list_does_not_load_note_text(self):
+        """В списке заметок не загружается текст заметки."""
+        response = self.auth_client_author.get(self.url)
+        for note in response.context['object_list']:
+            with self.subTest(note=note):
+                self.assertIn('text', note.get_deferred_fields())
+
+    def test_invalid_cursor(self):
+        """Некорректный курсор приводит к ошибке 404."""
+        response = self.auth_client_author.get(self.url, {'after': 'abc'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_out_of_range_cursor(self):
+        """Курсор за пределами 64-битного id тоже приводит к 404."""
+        for name in ('after', 'before'):
+            for cursor in ('99999999999999999999', '-1'):
+                with self.subTest(name=name, cursor=cursor):
+                    response = self.auth_client_author.get(
+                        self.url, {name: cursor}
+                    )
+                    self.assertEqual(
+                        response.status_code, HTTPStatus.NOT_FOUND
+                    )
+
+
+class TestNoteSearch(TestCase):
+    """Набор тестов для проверки поиска по заметкам."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка данных для тестов."""
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.auth_client_author = Client()
+        cls.auth_client_author.force_login(cls.author)
+        cls.note_in_text = Note.objects.create(
+            title='Покупки',
+            text='Купить Молоко и хлеб',
+            author=cls.author,
+        )
+        cls.note_in_title = Note.objects.create(
+            title='Молоко',
+            text='Проверить срок годности',
+            author=cls.author,
+        )
+        cls.note_reader = Note.objects.create(
+            title='Молоко читателя',
+            text='Текст Читателя',
+            author=cls.reader,
+        )
+        cls.url = reverse('notes:search')
+
+    def search(self, query):
+        response = self.auth_client_author.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return list(response.context['object_list'])
+
+    def test_search_finds_only_own_notes(self):
+        """Поиск находит заметки автора и не находит чужие."""
+        self.assertEqual(
+            set(self.search('молоко')),
+            {self.note_in_text, self.note_in_title},
+        )
+
+    def test_title_match_ranks_first(self):
+        """Совпадение в заголовке важнее совпадения в тексте."""
+        self.assertEqual(self.search('молоко')[0], self.note_in_title)
+
+    def test_search_by_word_prefix(self):
+        self.assertEqual(self.search('хле'), [self.note_in_text])
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметок."""
+        self.note_in_text.text = 'Купить кефир'
+        self.note_in_text.save()
+        self.assertEqual(self.search('кефир'), [self.note_in_text])
+        self.assertEqual(self.search('хлеб'), [])
+        self.note_in_title.delete()
+        self.assertEqual(self.search('молоко'), [])
+
+    def test_search_syntax_in_query_is_ignored(self):
+        """Операторы FTS5 в запросе считаются обычными словами."""
+        self.assertEqual(self.search('молоко" OR "'), [])
+        self.assertEqual(self.search('"*'), [])
+
+
+class TestWarmUp(SimpleTestCase):
+    """Набор тестов для проверки прогрева шаблонов."""
+
+    def test_warm_up_compiles_project_templates(self):
+        """Прогрев компилирует все шаблоны templates/, если он включён."""
+        self.assertEqual(warm_up(), 0)
+        names = template_names(settings.TEMPLATES[0]['DIRS'][0])
+        self.assertIn('notes/list.html', names)
+        with override_settings(WARM_UP_ON_START=True):
+            self.assertEqual(warm_up(), len(names))
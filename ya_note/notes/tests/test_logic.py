@@ -1,12 +1,25 @@
+import json
+import threading
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
 from django.urls import reverse
 from pytils.translit import slugify
 
+from notes import models, seed
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import allocate_slug, slug_variants
 
 User = get_user_model()
 
@@ -76,6 +89,62 @@ class TestNoteOperations(TestCase):
         expected_slug = slugify(self.NOTE_TITLE)
         self.assertEqual(generated_slug, expected_slug)
 
+    def test_same_titles_get_numbered_slugs(self):
+        """Заметки с одинаковым заголовком получают slug-2, slug-3."""
+        for _ in range(2):
+            self.author_client.post(
+                self.url, data={'title': self.NOTE_TITLE,
+                                'text': self.NOTE_TEXT})
+        base = slugify(self.NOTE_TITLE)
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            [base, f'{base}-2', f'{base}-3'],
+        )
+
+    def test_slug_is_allocated_in_one_query(self):
+        base = slugify(self.NOTE_TITLE)
+        Note.objects.create(
+            title='Другая', text=self.NOTE_TEXT, author=self.author,
+            slug=f'{base}-2',
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_slug(Note, base), f'{base}-3')
+
+    def test_slug_variants_skip_other_titles(self):
+        """Подбор читает только сам slug и варианты с номером."""
+        for slug in ('spisok', 'spisok-2', 'spisok-10', 'spisok-pokupok',
+                     'spisok-2-idei', 'spisok2'):
+            Note.objects.create(
+                title='Список', text=self.NOTE_TEXT, author=self.author,
+                slug=slug,
+            )
+        self.assertEqual(
+            set(Note.objects.filter(
+                slug_variants('spisok', 100)
+            ).values_list('slug', flat=True)),
+            {'spisok', 'spisok-2', 'spisok-10'},
+        )
+        self.assertEqual(allocate_slug(Note, 'spisok'), 'spisok-3')
+
+    def test_slug_taken_concurrently_is_reallocated(self):
+        """Если slug заняли между подбором и вставкой, он подбирается снова."""
+        base = slugify(self.NOTE_TITLE)
+
+        def allocate_once_stale(model, slug_base, **kwargs):
+            # Первый подбор «не видит» заметку, вставленную параллельно.
+            if allocate.call_count == 1:
+                return slug_base
+            return allocate_slug(model, slug_base, **kwargs)
+
+        with mock.patch.object(
+            models, 'allocate_slug', side_effect=allocate_once_stale
+        ) as allocate:
+            note = Note.objects.create(
+                title=self.NOTE_TITLE, text=self.NOTE_TEXT, author=self.author
+            )
+        self.assertEqual(allocate.call_count, 2)
+        self.assertEqual(note.slug, f'{base}-2')
+
     def test_non_unique_slug_validation(self):
         """Проверка, что невозможно создать две заметки с одинаковым slug."""
         form_data = {
@@ -119,3 +188,210 @@ class TestNoteOperations(TestCase):
         response = self.reader_client.delete(self.delete_url)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTrue(Note.objects.filter(id=self.note.id).exists())
+
+
+class TestConcurrentNoteCreate(TransactionTestCase):
+    """Параллельные отправки формы заметки с одним заголовком."""
+
+    SUBMISSIONS = 8
+
+    def test_parallel_creates_get_distinct_slugs(self):
+        author = User.objects.create(username='Марти')
+        clients = []
+        for _ in range(self.SUBMISSIONS):
+            client = Client()
+            client.force_login(author)
+            clients.append(client)
+        barrier = threading.Barrier(self.SUBMISSIONS)
+        statuses = []
+
+        def submit(client):
+            try:
+                barrier.wait()
+                response = client.post(
+                    reverse('notes:add'),
+                    data={'title': 'Список дел', 'text': 'Текст'},
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=submit, args=(client,))
+            for client in clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(statuses, [HTTPStatus.FOUND] * self.SUBMISSIONS)
+        slugs = list(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), self.SUBMISSIONS)
+        self.assertEqual(len(set(slugs)), self.SUBMISSIONS)
+
+
+class TestNotesImportExport(TestCase):
+    """Набор тестов для проверки импорта и экспорта заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка данных для тестов."""
+        cls.author = User.objects.create(username='Марти')
+        cls.reader = User.objects.create(username='Раст')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', author=cls.author
+        )
+        Note.objects.create(
+            title='Чужая заметка', text='Текст', author=cls.reader
+        )
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.export_url = reverse('notes:export')
+        cls.import_url = reverse('notes:import')
+
+    def upload(self, *notes):
+        content = '\n'.join(
+            note if isinstance(note, str)
+            else json.dumps(note, ensure_ascii=False)
+            for note in notes
+        )
+        return self.author_client.post(self.import_url, {
+            'file': SimpleUploadedFile(
+                'notes.jsonl', content.encode('utf-8')
+            ),
+        })
+
+    def test_export_streams_own_notes(self):
+        """Выгружаются все заметки пользователя и только они."""
+        response = self.author_client.get(self.export_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'title': 'Заголовок', 'text': 'Текст', 'slug': self.note.slug}],
+        )
+
+    @override_settings(NOTES_JSONL_BATCH_SIZE=2)
+    def test_import_creates_notes(self):
+        """Заметки из файла создаются пачками, slug генерируется."""
+        response = self.upload(
+            {'title': 'Первая', 'text': 'Текст 1'},
+            {'title': 'Вторая', 'text': 'Текст 2', 'slug': 'second'},
+            {'title': 'Третья', 'text': 'Текст 3'},
+        )
+        self.assertEqual(response.context['result'].created, 3)
+        notes = Note.objects.filter(author=self.author).exclude(
+            pk=self.note.pk
+        ).order_by('id')
+        self.assertEqual(
+            [(note.title, note.slug) for note in notes],
+            [
+                ('Первая', slugify('Первая')),
+                ('Вторая', 'second'),
+                ('Третья', slugify('Третья')),
+            ],
+        )
+
+    def test_import_skips_taken_slugs(self):
+        response = self.upload(
+            {'title': 'Дубль', 'text': 'Текст', 'slug': self.note.slug},
+            {'title': 'Новая', 'text': 'Текст', 'slug': 'new'},
+            {'title': 'Дубль', 'text': 'Текст', 'slug': 'new'},
+        )
+        self.assertEqual(response.context['result'], (1, 2))
+        self.assertEqual(Note.objects.filter(author=self.author).count(), 2)
+
+    def test_import_numbers_generated_slugs(self):
+        """Заметки без slug не пропускаются, а получают номер."""
+        response = self.upload(
+            {'title': self.note.title, 'text': 'Текст'},
+            {'title': self.note.title, 'text': 'Текст'},
+        )
+        self.assertEqual(response.context['result'], (2, 0))
+        self.assertEqual(
+            sorted(Note.objects.filter(author=self.author).values_list(
+                'slug', flat=True
+            )),
+            [self.note.slug, f'{self.note.slug}-2', f'{self.note.slug}-3'],
+        )
+
+    def test_invalid_line_cancels_import(self):
+        """Ошибка в любой строке отменяет весь импорт."""
+        initial_notes_count = Note.objects.count()
+        response = self.upload(
+            {'title': 'Первая', 'text': 'Текст'},
+            'не JSON',
+        )
+        self.assertIn('Строка 2', response.context['form'].errors['file'][0])
+        self.assertEqual(Note.objects.count(), initial_notes_count)
+
+    def test_commands_round_trip(self):
+        """Выгрузка командой загружается обратно другому пользователю."""
+        output = StringIO()
+        call_command('export_notes', self.author.username, stdout=output)
+        self.note.delete()
+        with TemporaryDirectory() as directory:
+            input_path = Path(directory) / 'notes.jsonl'
+            input_path.write_text(output.getvalue(), encoding='utf-8')
+            call_command(
+                'import_notes', self.reader.username, str(input_path),
+                stdout=StringIO(),
+            )
+        self.assertTrue(
+            Note.objects.filter(author=self.reader, slug=self.note.slug)
+        )
+
+
+class TestSeed(TestCase):
+    """Набор тестов для проверки генератора синтетических данных."""
+
+    def run_seed(self, **options):
+        call_command('seed', users=3, batch_size=4, stdout=StringIO(),
+                     **options)
+
+    def test_seed_is_deterministic(self):
+        """Один и тот же seed даёт те же заметки и тех же авторов."""
+        self.run_seed(notes=10, seed=1)
+        fields = ('title', 'text', 'slug', 'author__username')
+        first = list(Note.objects.order_by('id').values_list(*fields))
+        Note.objects.all().delete()
+        self.run_seed(notes=10, seed=1)
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list(*fields)), first
+        )
+        self.assertEqual(User.objects.count(), 3)
+
+    @mock.patch.object(seed, 'COMMON_TITLE_SHARE', 1)
+    @mock.patch.object(seed, 'COMMON_TITLES', ('Заголовок',))
+    def test_seed_numbers_slugs_like_save(self):
+        """Slug совпадающих заголовков нумеруются, как при Note.save."""
+        author = User.objects.create(username='Марти')
+        Note.objects.create(title='Заголовок', text='Текст', author=author)
+        self.run_seed(notes=9)
+        base = slugify('Заголовок')
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list('slug', flat=True)),
+            [base] + [f'{base}-{number}' for number in range(2, 11)],
+        )
+
+    def test_slug_allocator_reads_taken_titles_per_batch(self):
+        """Занятые в БД заголовки не дают запроса на каждую заметку."""
+        author = User.objects.create(username='Марти')
+        titles = [f'Заголовок {number}' for number in range(20)]
+        Note.objects.bulk_create(
+            Note(title=title, text='Текст', slug=slug, author=author)
+            for title in titles
+            for slug in (slugify(title), f'{slugify(title)}-3')
+        )
+        notes = [
+            Note(title=title, text='Текст', author=author)
+            for title in titles * 2
+        ]
+        with self.assertNumQueries(3):
+            seed.SlugAllocator().assign(notes)
+        self.assertEqual(
+            [note.slug for note in notes],
+            [f'{slugify(title)}-2' for title in titles]
+            + [f'{slugify(title)}-4' for title in titles],
+        )
@@ -0,0 +1,176 @@
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from ya_common.middleware import QueryBudgetExceeded
+from ya_common.replicas import PIN_COOKIE
+from ya_common.sqlite import apply_sqlite_pragmas, full_scans
+
+User = get_user_model()
+
+
+@skipIf(connection.vendor != 'sqlite', 'План запроса в формате SQLite.')
+class TestQueryPlans(TestCase):
+    """Набор тестов для проверки использования индексов страницами."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка данных для тестов."""
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        for user in (cls.author, cls.reader):
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка {index}',
+                    text='Текст',
+                    slug=f'{user.username}-{index}',
+                    author=user,
+                )
+                for index in range(5)
+            )
+        cls.note = Note.objects.filter(author=cls.author).first()
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def test_views_use_indexes(self):
+        """Запросы страниц читают таблицы только по индексам."""
+        urls = (
+            ('notes:list', None),
+            ('notes:detail', (self.note.slug,)),
+            ('notes:edit', (self.note.slug,)),
+            ('notes:delete', (self.note.slug,)),
+        )
+        for name, args in urls:
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as context:
+                    self.author_client.get(reverse(name, args=args))
+                self.assertTrue(context.captured_queries)
+                self.assertEqual(full_scans(context.captured_queries), [])
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_sqlite_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            (initial,), = cursor.fetchall()
+            apply_sqlite_pragmas(sender=None, connection=connection)
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchall(), [(-1234,)])
+            cursor.execute(f'PRAGMA cache_size = {initial}')
+
+    def test_next_notes_page_uses_index(self):
+        with CaptureQueriesContext(connection) as context:
+            self.author_client.get(
+                reverse('notes:list'), {'after': self.note.id}
+            )
+        self.assertEqual(full_scans(context.captured_queries), [])
+
+
+class TestQueryBudget(TestCase):
+    """Набор тестов для проверки бюджета SQL-запросов страниц."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка данных для тестов."""
+        cls.author = User.objects.create(username='author')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.url = reverse('notes:list')
+
+    @override_settings(
+        QUERY_BUDGETS={'notes:list': 0}, QUERY_BUDGET_RAISE=True
+    )
+    def test_query_budget_exceeded_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.author_client.get(self.url)
+
+    @override_settings(
+        QUERY_BUDGETS={'notes:list': 0}, QUERY_BUDGET_RAISE=False
+    )
+    def test_query_budget_exceeded_is_logged(self):
+        with self.assertLogs('ya_common.middleware', 'WARNING') as logs:
+            self.author_client.get(self.url)
+        self.assertIn('notes:list', logs.output[0])
+
+    def test_session_and_user_come_from_process_cache(self):
+        """Повторный запрос не читает из БД ни сессию, ни пользователя."""
+        self.author_client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            self.author_client.get(self.url)
+        self.assertTrue(context.captured_queries)
+        for query in context.captured_queries:
+            self.assertNotIn('django_session', query['sql'])
+            self.assertNotIn('auth_user', query['sql'])
+
+    def test_note_is_saved_once_on_create(self):
+        """При создании заметка сохраняется одним запросом."""
+        with CaptureQueriesContext(connection) as context:
+            self.author_client.post(
+                reverse('notes:add'), {'title': 'Заметка', 'text': 'Текст'}
+            )
+        writes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+        ]
+        self.assertEqual(len(writes), 1)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class TestReplicaReads(TestCase):
+    """Набор тестов для проверки чтения страниц с реплики."""
+
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Реплика отстаёт от default: пользователь и сессия на ней уже есть,
+        а заметки у баз разные.
+        """
+        cls.author = User.objects.create(username='author')
+        cls.author.save(using='replica')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        Session.objects.get(
+            pk=cls.author_client.session.session_key
+        ).save(using='replica')
+        cls.primary_note = Note.objects.create(
+            title='Из default', text='Текст', slug='primary',
+            author=cls.author,
+        )
+        cls.replica_note = Note(
+            title='С реплики', text='Текст', slug='replica',
+            author=cls.author,
+        )
+        cls.replica_note.save(using='replica')
+
+    def test_notes_pages_read_from_replica(self):
+        response = self.author_client.get(reverse('notes:list'))
+        self.assertEqual(
+            list(response.context['object_list']), [self.replica_note]
+        )
+        for note, status in (
+            (self.replica_note, 200), (self.primary_note, 404)
+        ):
+            with self.subTest(note=note.slug):
+                response = self.author_client.get(
+                    reverse('notes:detail', args=(note.slug,))
+                )
+                self.assertEqual(response.status_code, status)
+
+    def test_reads_after_write_use_primary(self):
+        """После записи список заметок читается из default."""
+        response = self.author_client.post(
+            reverse('notes:add'), {'title': 'Новая', 'text': 'Текст'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = self.author_client.get(reverse('notes:list'))
+        self.assertIn(
+            'Новая',
+            [note.title for note in response.context['object_list']],
+        )
@@ -34,6 +34,9 @@ class TestRoutes(TestCase):
             ('users:logout', self.client, HTTPStatus.OK, None),
             ('users:signup', self.client, HTTPStatus.OK, None),
             ('notes:list', self.client, HTTPStatus.FOUND, None),
+            ('notes:search', self.client, HTTPStatus.FOUND, None),
+            ('notes:search', self.reader_client, HTTPStatus.OK, None),
+            ('notes:import', self.reader_client, HTTPStatus.OK, None),
             ('notes:add', self.client, HTTPStatus.FOUND, None),
             ('notes:success', self.client, HTTPStatus.FOUND, None),
             ('notes:edit', self.author_client,
@@ -65,7 +68,10 @@ class TestRoutes(TestCase):
             ('notes:detail', (self.note.slug,)),
             ('notes:add', None),
             ('notes:success', None),
-            ('notes:list', None)
+            ('notes:list', None),
+            ('notes:search', None),
+            ('notes:export', None),
+            ('notes:import', None),
         ]
 
         for name, args in urls:
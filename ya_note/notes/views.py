@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .forms import WARNING, ImportForm, NoteForm, SearchForm
+from .jsonl import NotesImportError, export_notes, import_notes
 from .models import Note
+from .search import search_notes
+
+# Наибольший id: BigAutoField — знаковое 64-битное целое.
+MAX_PK = 2 ** 63 - 1
 
 
 class Home(generic.TemplateView):
@@ -26,22 +34,32 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormBase(NoteBase):
+    """Базовый класс для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Указанный slug мог занять параллельный запрос после проверки."""
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            slug = form.cleaned_data['slug']
+            form.add_error('slug', slug + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteFormBase, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteFormBase, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -53,7 +71,98 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_cursor(self, name):
+        cursor = self.request.GET.get(name)
+        if cursor is None:
+            return None
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            cursor = None
+        if cursor is None or not 0 <= cursor <= MAX_PK:
+            raise Http404('Некорректный курсор страницы заметок.')
+        return cursor
+
+    def get_queryset(self):
+        """
+        Страница заметок с курсором по id, без текста заметок.
+
+        `after` открывает заметки после указанного id, `before` — перед ним.
+        Размер страницы определяется в настройках проекта.
+        """
+        per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+        queryset = super().get_queryset().only('id', 'slug', 'title')
+        after = self.get_cursor('after')
+        before = self.get_cursor('before')
+        if before is not None:
+            notes = list(
+                queryset.filter(id__lt=before).order_by('-id')[:per_page + 1]
+            )
+            has_previous = len(notes) > per_page
+            notes = notes[:per_page][::-1]
+            has_next = True
+        else:
+            if after is not None:
+                queryset = queryset.filter(id__gt=after)
+            notes = list(queryset.order_by('id')[:per_page + 1])
+            has_next = len(notes) > per_page
+            notes = notes[:per_page]
+            has_previous = after is not None
+        self.previous_before = notes[0].id if notes and has_previous else None
+        self.next_after = notes[-1].id if notes and has_next else None
+        return notes
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['previous_before'] = self.previous_before
+        context['next_after'] = self.next_after
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        self.form = SearchForm(self.request.GET)
+        if not self.form.is_valid() or not self.form.cleaned_data['q']:
+            return self.model.objects.none()
+        return search_notes(self.request.user, self.form.cleaned_data['q'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['form'] = self.form
+        return context
+
+
+class NoteExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в формате JSON Lines."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_notes(request.user),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'attachment; filename="notes.jsonl"'
+        return response
+
+
+class NoteImport(LoginRequiredMixin, generic.FormView):
+    """Загрузка заметок пользователя из файла JSON Lines."""
+    template_name = 'notes/import.html'
+    form_class = ImportForm
+
+    def form_valid(self, form):
+        try:
+            result = import_notes(self.request.user, form.cleaned_data['file'])
+        except NotesImportError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result)
+        )
@@ -22,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ya_common.middleware.QueryBudgetMiddleware',
+    'ya_common.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,16 +51,57 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать шаблоны при запуске воркера, см. ya_common/warmup.py.
+WARM_UP_ON_START = False
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'ya_common.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Транзакция сразу берёт блокировку записи, см.
+            # ya_common/sqlite_backend/base.py.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite, см. settings_production.
+SQLITE_PRAGMAS = {}
+
+DATABASE_ROUTERS = ['ya_common.replicas.ReplicaRouter']
+# Псевдонимы реплик из DATABASES, с которых читают страницы REPLICA_VIEWS.
+# Пустой список — всё читается из default.
+DATABASE_REPLICAS = []
+REPLICA_VIEWS = ('notes:list', 'notes:detail')
+# Сколько секунд после запроса с записью браузер читает только из default.
+REPLICA_PIN_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Сессии в памяти процесса поверх таблицы сессий,
+    # см. ya_common/sessions.py.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+SESSION_ENGINE = 'ya_common.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+# Сколько секунд процесс доверяет сессии из своего кеша.
+SESSION_CACHE_TTL = 60
+
+# Пользователь запроса из кеша процесса, см. ya_common/auth.py.
+AUTHENTICATION_BACKENDS = ['ya_common.auth.CachedModelBackend']
+USER_CACHE_TTL = 60
+USER_CACHE_SIZE = 1000
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +130,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+
+NOTES_SEARCH_RESULTS = 50
+
+# Размер пачки при импорте и экспорте заметок в формате JSON Lines.
+NOTES_JSONL_BATCH_SIZE = 1000
+
+# Размер пачки bulk_create в команде seed.
+NOTES_SEED_BATCH_SIZE = 10_000
+
+# Сколько SQL-запросов может выполнить страница, по имени маршрута.
+# Учитываются и запросы сессии и пользователя.
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:list': 3,
+    'notes:search': 3,
+    # Заметки отдаются потоком уже после ответа и в бюджет не входят.
+    'notes:export': 2,
+    'notes:add': 4,
+    'notes:detail': 3,
+    'notes:edit': 5,
+    'notes:delete': 4,
+    'notes:success': 2,
+}
+# При превышении бюджета не только писать в лог, но и падать с ошибкой.
+QUERY_BUDGET_RAISE = DEBUG
@@ -0,0 +1,40 @@
+"""
+Боевой профиль: те же настройки, но без отладки и с настройкой SQLite.
+
+Запуск: DJANGO_SETTINGS_MODULE=yanote.settings_production
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES, TEMPLATES
+
+DEBUG = False
+
+QUERY_BUDGET_RAISE = False
+
+# Шаблоны компилируются один раз за жизнь процесса, и сразу при запуске
+# воркера, а не на первых запросах.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+WARM_UP_ON_START = True
+
+# Соединение живёт между запросами: не нужно заново открывать файл
+# и выполнять PRAGMA на каждый запрос.
+DATABASES['default']['CONN_MAX_AGE'] = 60
+
+SQLITE_PRAGMAS = {
+    # Читатели не блокируют писателя, а писатель — читателей.
+    'journal_mode': 'wal',
+    # В режиме WAL не теряет целостность, fsync только на контрольных точках.
+    'synchronous': 'normal',
+    # Ждать освобождения блокировки до 20 секунд вместо ошибки
+    # "database is locked".
+    'busy_timeout': 20000,
+    # Чтение файла БД через отображение в память, до 256 МБ.
+    'mmap_size': 256 * 1024 * 1024,
+    # Кеш страниц на соединение: отрицательное значение — в КиБ (64 МБ).
+    'cache_size': -64 * 1024,
+}
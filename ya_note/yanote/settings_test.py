@@ -0,0 +1,25 @@
+"""
+Профиль тестов: те же настройки и БД-реплика для тестов чтения с реплик.
+
+pytest.ini и run_tests подключают его вместо settings.
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES
+
+# Отдельная БД-реплика: тесты видят, откуда читает страница.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'db_replica.sqlite3',
+}
+
+# Тестовая БД в файле, а не в памяти: тесты параллельных запросов
+# открывают к ней несколько соединений из потоков. Имя с номером
+# процесса, чтобы части run_tests.py не делили один файл.
+DATABASES['default']['TEST'] = {
+    'NAME': BASE_DIR / f'test_db_{os.getpid()}.sqlite3',
+}
+
+# В тестах превышение бюджета запросов — ошибка.
+QUERY_BUDGET_RAISE = True